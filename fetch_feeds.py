@@ -4,13 +4,13 @@ import feedparser
 import os
 import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import platform
+import functools
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
-import warnings
-
-# Filter out the XML parsing warning
-warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+from lxml import etree
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +25,9 @@ RSS_FEEDS = [
     os.getenv('RSS_FEED_6')  # Added NHC feed
 ]
 
+# Maximum number of feeds fetched and parsed at the same time
+FEED_FETCH_CONCURRENCY = int(os.getenv('FEED_FETCH_CONCURRENCY', '8'))
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -35,9 +38,11 @@ logging.basicConfig(
     ]
 )
 
+@functools.lru_cache(maxsize=1)
 def get_user_agent():
     """
     Build a descriptive and ethical user agent string.
+    The result is cached, since none of its parts change during the process lifetime.
     
     Format: DisasterMonitor/1.1.0 (contact@yourorganization.org; https://yourorganization.org/disastermonitor) Python/3.9 Platform/Linux
     """
@@ -49,255 +54,403 @@ def get_user_agent():
     
     return f"DisasterMonitor/{version} ({contact}; {website}) Python/{python_version} Platform/{system_platform}"
 
-def fetch_rss_feeds(feeds):
+def _create_session():
+    """
+    Create the HTTP session shared by all feed fetches.
+    
+    The session lives for the whole process, so keep-alive connections to the
+    feed hosts stay warm between scheduled runs instead of paying a new TCP+TLS
+    handshake per feed on every tick.
+    """
+    session = requests.Session()
+    pool_size = max(len(RSS_FEEDS), 1)
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=2, backoff_factor=0.3)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = get_user_agent()
+    return session
+
+# Shared HTTP session (connection pool) for all feed requests
+_SESSION = _create_session()
+
+# Size of the chunks a feed body is read in while it streams in
+_CHUNK_SIZE = 64 * 1024
+
+def _load_feed_cache(conn, feed_urls):
+    """
+    Load cached validators and bodies for the given feeds from the database.
+
+    Returns:
+        dict: Mapping of feed URL to (etag, last_modified, body)
+    """
+    try:
+        placeholders = ','.join('?' for _ in feed_urls)
+        rows = conn.execute(f'SELECT url, etag, last_modified, body FROM feed_cache WHERE url IN ({placeholders})',
+                            feed_urls)
+        return {url: (etag, last_modified, body) for url, etag, last_modified, body in rows}
+    except Exception as e:
+        logging.warning(f"Error loading feed cache: {e}")
+        return {}
+
+def _save_feed_cache(conn, updates):
+    """
+    Store the validators and bodies of freshly downloaded feeds.
+
+    Args:
+        updates (list): List of (url, etag, last_modified, body) tuples
+    """
+    if not updates:
+        return
+    try:
+        with conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO feed_cache (url, etag, last_modified, body, fetched_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', updates)
+    except Exception as e:
+        logging.warning(f"Error saving feed cache: {e}")
+
+def conditional_get(feed_url, cached=None, parser=None):
+    """
+    Download a single feed, using an HTTP conditional GET when a cached copy exists.
+    Runs in a worker thread so feeds are fetched concurrently.
+
+    Args:
+        feed_url (str): URL of the feed
+        cached (tuple): Optional (etag, last_modified, body) from the feed cache
+        parser (etree.XMLParser): Optional parser that is fed the body chunk by chunk
+            while it downloads, so XML parsing overlaps with the transfer
+
+    Returns:
+        tuple: (content, validators) where validators is (etag, last_modified) for a
+        fresh download, or None when the server answered 304 and the cached body is reused
+    """
+    logging.info(f"Fetching feed: {feed_url}")
+
+    # Only send validators if we still have the body they refer to
+    headers = {}
+    if cached and cached[2] is not None:
+        etag, last_modified, _ = cached
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+    # Fetch the feed content manually to avoid parsing errors
+    with _SESSION.get(feed_url, headers=headers, timeout=15, stream=True) as response:
+        if response.status_code == 304 and headers:
+            logging.info(f"Feed not modified since last fetch, using cached copy: {feed_url}")
+            if parser is not None:
+                parser.feed(cached[2])
+            return cached[2], None
+
+        response.raise_for_status()
+        
+        # The raw bytes are still kept for the feed cache and the feedparser fallback
+        chunks = []
+        for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+            chunks.append(chunk)
+            if parser is not None:
+                parser.feed(chunk)
+        
+        return b''.join(chunks), (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+def _xml_parser():
+    """
+    Create an lxml parser for feed bytes, recovering from malformed markup where possible.
+    """
+    # A fresh parser per feed keeps this safe to use from worker threads
+    return etree.XMLParser(recover=True, resolve_entities=False, no_network=True)
+
+def _item_to_entry(item):
+    """
+    Flatten an RSS <item> element into a feedparser-style entry dictionary.
+    
+    Namespaced elements use feedparser's naming, e.g. gdacs:alertlevel -> gdacs_alertlevel.
+    """
+    entry = {}
+    for child in item:
+        # Skip comments and processing instructions
+        if not isinstance(child.tag, str):
+            continue
+        localname = etree.QName(child).localname
+        key = f"{child.prefix}_{localname}" if child.prefix else localname
+        if key not in entry:
+            entry[key] = (child.text or '').strip()
+    
+    # Map RSS element names onto the fields feedparser would expose
+    if 'description' in entry:
+        entry.setdefault('summary', entry['description'])
+    if 'pubDate' in entry:
+        entry.setdefault('published', entry['pubDate'])
+    return entry
+
+def _lower(expr):
+    """
+    Wrap an XPath 1.0 expression so it compares case-insensitively (ASCII only).
+    """
+    return f"translate({expr}, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+
+# GDACS green alerts: any *alertlevel element (e.g. gdacs:alertlevel) equal to
+# "green", or a title starting with "green " as fallback
+_GDACS_GREEN_XPATH = (
+    "//item["
+    "*[substring(local-name(), string-length(local-name()) - 9) = 'alertlevel'"
+    f" and {_lower('normalize-space()')} = 'green']"
+    f" or starts-with({_lower('normalize-space(title)')}, 'green ')"
+    "]"
+)
+
+# SPC Mesoscale Discussions and Outlooks, by link path or title
+_SPC_MD_OUTLOOK_XPATH = (
+    "//item["
+    f"contains({_lower('link')}, '/md/') or contains({_lower('link')}, '/outlook/')"
+    f" or starts-with({_lower('normalize-space(title)')}, 'spc md')"
+    f" or contains({_lower('title')}, 'outlook')"
+    "]"
+)
+
+# Known feed sources: (URL host, source type, default feed title)
+_SOURCES = (
+    ("gdacs.org", "gdacs", "GDACS RSS information"),
+    ("reliefweb.int", "reliefweb", "ReliefWeb - Disasters"),
+    ("wildfire.gov", "inciweb", "InciWeb"),
+    ("spc.noaa.gov", "noaa_spc", "SPC Forecast Products"),
+    ("usgs.gov", "usgs", "USGS Magnitude 4.5+ Earthquakes"),
+    ("nhc.noaa.gov", "nhc", "National Hurricane Center"),
+)
+
+# GDACS entry fields copied onto reports: (entry key, report key)
+_GDACS_REPORT_FIELDS = (
+    ("gdacs_alertlevel", "gdacs_alertlevel"),
+    ("gdacs_icon", "icon"),
+)
+
+# Feeds whose items are pre-filtered directly in the XML: (URL host, label, XPath of items to drop)
+_XML_PREFILTERS = (
+    ("gdacs.org", "GDACS", _GDACS_GREEN_XPATH),
+    ("spc.noaa.gov", "SPC", _SPC_MD_OUTLOOK_XPATH),
+)
+
+def _find_prefilter(feed_url):
+    """
+    Return the (label, XPath of items to drop) pre-filter for a feed, or None.
+    """
+    feed_url = feed_url.lower()
+    return next(
+        ((label, drop_xpath) for host, label, drop_xpath in _XML_PREFILTERS if host in feed_url),
+        None
+    )
+
+def _prefilter(parser, drop_xpath, label):
+    """
+    Finish parsing a feed and drop every item selected by drop_xpath.
+    
+    The selection runs as a single XPath query inside lxml, and only the kept
+    items are converted to entry dictionaries.
+    
+    Args:
+        parser (etree.XMLParser): Parser that has been fed the whole feed body
+    
+    Returns:
+        tuple: (entries, channel_title) with the kept items as entry dictionaries
+    """
+    root = parser.close()
+    if root is None:
+        raise ValueError("Feed content could not be parsed as XML")
+    dropped_items = set(root.xpath(drop_xpath))
+    
+    kept_entries = []
+    total_items = 0
+    filtered_count = 0
+    for item in root.iter('item'):
+        total_items += 1
+        if item in dropped_items:
+            logging.info(f"Pre-filtered {label} report in XML parsing: {item.findtext('title') or 'Unknown title'}")
+            filtered_count += 1
+            continue
+        kept_entries.append(_item_to_entry(item))
+    
+    if filtered_count > 0:
+        logging.info(f"Pre-filtered {filtered_count} of {total_items} {label} reports in XML parsing")
+    
+    return kept_entries, root.findtext('channel/title')
+
+def _parse_and_filter(feed_url, content, parser=None):
+    """
+    Pre-filter and parse a fetched feed, returning its disaster reports.
+    
+    For GDACS/SPC feeds, parser may be an XML parser that was already fed the
+    content while it downloaded; otherwise the content is parsed here.
+    """
+    reports = []
+    
+    # Entries and channel title, filled in directly by the XML pre-filter for
+    # GDACS/SPC so those feeds do not need a second parse by feedparser
+    entries = None
+    channel_title = None
+    
+    # Pre-filter GDACS green alerts and SPC discussions/outlooks directly in the XML
+    prefilter = _find_prefilter(feed_url)
+    if prefilter:
+        label, drop_xpath = prefilter
+        try:
+            # Skip if empty content
+            if not content.strip():
+                logging.warning(f"Empty content received from {label} feed")
+            else:
+                if parser is None:
+                    parser = _xml_parser()
+                    parser.feed(content)
+                entries, channel_title = _prefilter(parser, drop_xpath, label)
+        except Exception as e:
+            logging.warning(f"Error in {label} XML pre-filtering: {str(e)}")
+            # Fall back to regular feedparser if XML parsing fails
+    
+    # Parse feed with feedparser unless the XML pre-filter already did the work
+    if entries is None:
+        feed = feedparser.parse(content)
+        entries = feed.entries if hasattr(feed, 'entries') else []
+        if 'feed' in feed and 'title' in feed.feed:
+            channel_title = feed.feed.get('title')
+    
+    # Identify feed source for later use in extraction, and its default title
+    feed_source_url = feed_url.lower()
+    feed_source_type, default_title = next(
+        ((source_type, title) for host, source_type, title in _SOURCES if host in feed_source_url),
+        (None, "Unknown Source")
+    )
+    
+    # Determine feed title, first from the feed itself, else the source default
+    feed_title = channel_title or default_title
+
+    # Log successful fetch with entry count
+    logging.info(f"Successfully fetched {len(entries)} entries from {feed_title}")
+    
+    for entry in entries:
+        # Extract common fields with fallbacks
+        title = entry.get('title', 'No Title')
+        summary = entry.get('summary', entry.get('description', 'No Summary'))
+        link = entry.get('link', 'No Link')
+        published = entry.get('published', entry.get('updated', 'No Published Date'))
+        
+        # Final GDACS green alert filtering
+        if feed_source_type == "gdacs":
+            title_lower = title.lower()
+            if (entry.get('gdacs_alertlevel', '').lower() == 'green' or
+                title_lower.startswith("green ") or 
+                "green alert" in title_lower):
+                logging.info(f"Filtered GDACS green alert in feedparser stage: {title}")
+                continue
+        
+        # Final SPC report filtering
+        if feed_source_type == "noaa_spc":
+            link_lower = link.lower()
+            title_lower = title.lower()
+            if ("/md/" in link_lower or 
+                title_lower.startswith("spc md") or
+                "/outlook/" in link_lower or 
+                "outlook" in title_lower):
+                logging.info(f"Filtered SPC report in feedparser stage: {title}")
+                continue
+        
+        # Create a disaster report with feed source type
+        report = {
+            "title": title,
+            "summary": summary,
+            "link": link,
+            "published": published,
+            "source": feed_title,
+            "source_type": feed_source_type  # Add source type for specialized processing
+        }
+        
+        # Keep only the GDACS namespace fields used by later filtering, not the whole entry
+        if feed_source_type == "gdacs":
+            for entry_key, report_key in _GDACS_REPORT_FIELDS:
+                if entry.get(entry_key):
+                    report[report_key] = entry[entry_key]
+        
+        reports.append(report)
+
+    return reports
+
+def _fetch_and_parse(feed_url, cached=None):
+    """
+    Fetch one feed and parse it, all inside a worker thread.
+    
+    lxml releases the GIL while parsing, so feeds parse in parallel as well as
+    downloading in parallel. Feeds with an XML pre-filter are parsed
+    incrementally as their body streams in.
+    
+    Returns:
+        tuple: (content, validators, reports)
+    """
+    parser = _xml_parser() if _find_prefilter(feed_url) else None
+    content, validators = conditional_get(feed_url, cached, parser)
+    return content, validators, _parse_and_filter(feed_url, content, parser)
+
+def fetch_rss_feeds(feeds, db=None, max_workers=None):
     """
     Fetches RSS feeds and extracts relevant disaster reports.
     Also performs initial filtering directly on XML data.
-    """
-    disaster_reports = []
     
-    # Create a descriptive and respectful user agent
-    user_agent = get_user_agent()
-    headers = {"User-Agent": user_agent}
+    Feeds are requested and parsed concurrently, so total time is bounded by
+    the slowest feed rather than the sum of all of them. At most max_workers
+    feeds (default FEED_FETCH_CONCURRENCY) are in flight at once, which also
+    bounds how many feed bodies are held in memory while parsing.
     
-    logging.info(f"Using User-Agent: {user_agent}")
+    If a database connection is given, ETag/Last-Modified validators are kept in
+    its feed_cache table and unchanged feeds are answered with a 304 instead of a full download.
+    """
+    logging.info(f"Using User-Agent: {_SESSION.headers['User-Agent']}")
     
+    feed_urls = []
     for feed_url in feeds:
         if not feed_url:
             logging.warning("Skipping empty feed URL.")
             continue
-
-        logging.info(f"Fetching feed: {feed_url}")
-        
-        try:
-            # Fetch the feed content manually to avoid parsing errors
-            response = requests.get(feed_url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            # Pre-filter for GDACS green alerts directly in XML when possible
-            if "gdacs.org" in feed_url.lower():
-                try:
-                    # Check if content is actually XML
-                    xml_content = response.text
-                    
-                    # Skip if empty content
-                    if not xml_content.strip():
-                        logging.warning(f"Empty content received from GDACS feed")
-                    else:
-                        # Try parsing with BeautifulSoup which is more forgiving with malformed XML
-                        # Try different parsers in order of preference
-                        try:
-                            # Try lxml-xml parser first (proper XML parser)
-                            soup = BeautifulSoup(xml_content, 'lxml-xml')
-                        except:
-                            try:
-                                # Try lxml (HTML parser) next
-                                soup = BeautifulSoup(xml_content, 'lxml')
-                            except:
-                                try:
-                                    # Try html5lib if available
-                                    soup = BeautifulSoup(xml_content, 'html5lib')
-                                except:
-                                    # Fallback to built-in html.parser
-                                    soup = BeautifulSoup(xml_content, 'html.parser')
-                        
-                        # Find all items - first try with standard RSS path
-                        items = soup.find_all('item')
-                        
-                        if not items:
-                            # If no items found, try with namespace prefix
-                            items = soup.select('rss channel item')
-                        
-                        filtered_count = 0
-                        for item in items:
-                            # Look for alert level in various ways
-                            is_green_alert = False
-                            
-                            # Check for gdacs:alertlevel element directly
-                            alert_elem = item.find(lambda tag: tag.name.endswith('alertlevel'))
-                            if alert_elem and alert_elem.text.lower() == 'green':
-                                is_green_alert = True
-                            
-                            # Also check title as fallback
-                            title_elem = item.find('title')
-                            if title_elem and title_elem.text and title_elem.text.lower().startswith('green '):
-                                is_green_alert = True
-                            
-                            if is_green_alert:
-                                title = title_elem.text if title_elem else "Unknown title"
-                                logging.info(f"Pre-filtered GDACS green alert in XML parsing: {title}")
-                                filtered_count += 1
-                                
-                                # Remove this item from the XML
-                                item.decompose()
-                        
-                        if filtered_count > 0:
-                            logging.info(f"Pre-filtered {filtered_count} GDACS green alerts in XML parsing")
-                            
-                            # Convert modified XML back to string for feedparser
-                            modified_xml = str(soup)
-                            response._content = modified_xml.encode('utf-8')
-                            
-                except Exception as e:
-                    logging.warning(f"Error in GDACS XML pre-filtering: {str(e)}")
-                    # Fall back to regular feedparser if XML parsing fails
-            
-            # Pre-filter for SPC Mesoscale Discussions and Outlooks
-            if "spc.noaa.gov" in feed_url.lower():
-                try:
-                    # Check if content is actually XML
-                    xml_content = response.text
-                    
-                    # Skip if empty content
-                    if not xml_content.strip():
-                        logging.warning(f"Empty content received from SPC feed")
-                    else:
-                        # Try parsing with BeautifulSoup which is more forgiving with malformed XML
-                        # Try different parsers in order of preference
-                        try:
-                            # Try lxml-xml parser first (proper XML parser)
-                            soup = BeautifulSoup(xml_content, 'lxml-xml')
-                        except:
-                            try:
-                                # Try lxml (HTML parser) next
-                                soup = BeautifulSoup(xml_content, 'lxml')
-                            except:
-                                try:
-                                    # Try html5lib if available
-                                    soup = BeautifulSoup(xml_content, 'html5lib')
-                                except:
-                                    # Fallback to built-in html.parser
-                                    soup = BeautifulSoup(xml_content, 'html.parser')
-                        
-                        # Find all items
-                        items = soup.find_all('item')
-                        
-                        if not items:
-                            # If no items found, try with namespace prefix
-                            items = soup.select('rss channel item')
-                        
-                        total_items = len(items)
-                        filtered_count = 0
-                        items_to_remove = []
-                        
-                        for item in items:
-                            # Get link and title
-                            link_elem = item.find('link')
-                            title_elem = item.find('title')
-                            
-                            link = link_elem.text if link_elem else ""
-                            title = title_elem.text if title_elem else ""
-                            
-                            # Skip Mesoscale Discussions and Outlooks
-                            if (link and ("/md/" in link.lower() or "/outlook/" in link.lower())) or \
-                               (title and (title.lower().startswith("spc md") or "outlook" in title.lower())):
-                                logging.info(f"Pre-filtered SPC report in XML parsing: {title}")
-                                filtered_count += 1
-                                items_to_remove.append(item)
-                        
-                        # Remove filtered items after iterating
-                        for item in items_to_remove:
-                            item.decompose()
-                        
-                        if filtered_count > 0:
-                            logging.info(f"Pre-filtered {filtered_count} of {total_items} SPC reports in XML parsing")
-                            
-                            # Convert modified XML back to string for feedparser
-                            modified_xml = str(soup)
-                            response._content = modified_xml.encode('utf-8')
-                            
-                except Exception as e:
-                    logging.warning(f"Error in SPC XML pre-filtering: {str(e)}")
-                    # Fall back to regular feedparser if XML parsing fails
-            
-            # Parse feed with feedparser
-            feed = feedparser.parse(response.text)
-            
-            # Identify feed source for later use in extraction
-            feed_source_url = feed_url.lower()
-            feed_source_type = None
-            
-            if "gdacs.org" in feed_source_url:
-                feed_source_type = "gdacs"
-            elif "reliefweb.int" in feed_source_url:
-                feed_source_type = "reliefweb"
-            elif "wildfire.gov" in feed_source_url:
-                feed_source_type = "inciweb"
-            elif "spc.noaa.gov" in feed_source_url:
-                feed_source_type = "noaa_spc"
-            elif "usgs.gov" in feed_source_url:
-                feed_source_type = "usgs"
-            elif "nhc.noaa.gov" in feed_source_url:
-                feed_source_type = "nhc"
-            
-            # Determine feed title
-            feed_title = "Unknown Source"
-            
-            # First try to get from feed object
-            if 'feed' in feed and 'title' in feed.feed:
-                feed_title = feed.feed.get('title', 'Unknown Source')
-            
-            # Set default feed titles based on source URL if title not found
-            if feed_title == "Unknown Source":
-                if "gdacs.org" in feed_source_url:
-                    feed_title = "GDACS RSS information"
-                elif "reliefweb.int" in feed_source_url:
-                    feed_title = "ReliefWeb - Disasters"
-                elif "wildfire.gov" in feed_source_url:
-                    feed_title = "InciWeb"
-                elif "spc.noaa.gov" in feed_source_url:
-                    feed_title = "SPC Forecast Products"
-                elif "usgs.gov" in feed_source_url:
-                    feed_title = "USGS Magnitude 4.5+ Earthquakes"
-                elif "nhc.noaa.gov" in feed_source_url:
-                    feed_title = "National Hurricane Center"
-
-            # Log successful fetch with entry count
-            entry_count = len(feed.entries) if hasattr(feed, 'entries') else 0
-            logging.info(f"Successfully fetched {entry_count} entries from {feed_title}")
-            
-            for entry in feed.entries:
-                # Extract common fields with fallbacks
-                title = entry.get('title', 'No Title')
-                summary = entry.get('summary', entry.get('description', 'No Summary'))
-                link = entry.get('link', 'No Link')
-                published = entry.get('published', entry.get('updated', 'No Published Date'))
-                
-                # Final GDACS green alert filtering
-                if feed_source_type == "gdacs":
-                    title_lower = title.lower()
-                    if (title_lower.startswith("green ") or 
-                        "green alert" in title_lower or 
-                        "gdacs:alertlevel>green" in str(entry).lower()):
-                        logging.info(f"Filtered GDACS green alert in feedparser stage: {title}")
-                        continue
-                
-                # Final SPC report filtering
-                if feed_source_type == "noaa_spc":
-                    link_lower = link.lower()
-                    title_lower = title.lower()
-                    if ("/md/" in link_lower or 
-                        title_lower.startswith("spc md") or
-                        "/outlook/" in link_lower or 
-                        "outlook" in title_lower):
-                        logging.info(f"Filtered SPC report in feedparser stage: {title}")
-                        continue
-                
-                # Create a disaster report with feed source type
-                disaster_reports.append({
-                    "title": title,
-                    "summary": summary,
-                    "link": link,
-                    "published": published,
-                    "source": feed_title,
-                    "source_type": feed_source_type,  # Add source type for specialized processing
-                    "raw_entry": entry  # Store the raw entry for additional parsing if needed
-                })
+        feed_urls.append(feed_url)
+    
+    if not feed_urls:
+        logging.info("Total disaster reports fetched: 0")
+        return []
+    
+    feed_cache = _load_feed_cache(db, feed_urls) if db else {}
+    cache_updates = []
+    
+    # Keep results per feed so the report order matches the configured feed order
+    reports_by_feed = {}
+    
+    max_workers = max(1, min(max_workers or FEED_FETCH_CONCURRENCY, len(feed_urls)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_fetch_and_parse, feed_url, feed_cache.get(feed_url)): feed_url
+            for feed_url in feed_urls
+        }
         
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error fetching feed {feed_url}: {e}")
-        except Exception as e:
-            logging.error(f"Unexpected error processing feed {feed_url}: {e}")
+        # Collect each feed's reports as soon as it is done
+        for future in as_completed(futures):
+            feed_url = futures[future]
+            try:
+                content, validators, reports = future.result()
+                if validators and any(validators):
+                    cache_updates.append((feed_url, validators[0], validators[1], content))
+                reports_by_feed[feed_url] = reports
+            except requests.exceptions.RequestException as e:
+                logging.error(f"Error fetching feed {feed_url}: {e}")
+            except Exception as e:
+                logging.error(f"Unexpected error processing feed {feed_url}: {e}")
+    
+    if db:
+        _save_feed_cache(db, cache_updates)
+    
+    disaster_reports = []
+    for feed_url in feed_urls:
+        disaster_reports.extend(reports_by_feed.get(feed_url, []))
 
     logging.info(f"Total disaster reports fetched: {len(disaster_reports)}")
     return disaster_reports
@@ -2,6 +2,88 @@
 
 import re
 
+# Emoji rules for disaster-type headings, in priority order (earlier rules win)
+_EMOJI_RULES = (
+    ("quake", r'earthquake', "🌍"),  # Changed from 🌋 to 🌍 for earthquake
+    ("flood", r'flood', "🌊"),
+    ("fire", r'fire|wildfire', "🔥"),
+    ("hurr", r'hurricane|cyclone|typhoon', "🌀"),
+    ("tornado", r'tornado', "🌪️"),
+    ("storm", r'storm|thunder|lightning', "⛈️"),
+    ("volcano", r'volcano|eruption', "🌋"),
+    ("snow", r'snow|blizzard|winter', "❄️"),
+    ("drought", r'drought|heat', "☀️"),
+    ("md", r'MD \d+|Discussion', "🌪️"),  # SPC Mesoscale Discussions often relate to severe weather
+    ("warn", r'warning|advisory|watch', "⚠️"),
+)
+
+# All emoji rules fused into one alternation so a heading is scanned only once
+_CLASSIFIER = re.compile(
+    '|'.join(f'(?P<{name}>{pattern})' for name, pattern, _ in _EMOJI_RULES),
+    re.IGNORECASE
+)
+_EMOJI_MAP = {name: emoji for name, _, emoji in _EMOJI_RULES}
+_EMOJI_RANK = {name: rank for rank, (name, _, _) in enumerate(_EMOJI_RULES)}
+
+def _classify_heading(heading_text):
+    """
+    Return the emoji for a heading, honouring rule priority rather than match position.
+    """
+    best = None
+    for match in _CLASSIFIER.finditer(heading_text):
+        if best is None or _EMOJI_RANK[match.lastgroup] < _EMOJI_RANK[best]:
+            best = match.lastgroup
+            if _EMOJI_RANK[best] == 0:
+                break
+    return _EMOJI_MAP[best] if best else "🌐"  # Default emoji
+
+# Inline Markdown rewritten for Slack: bold, empty "More Info" links and [text](url) links
+_INLINE_PATTERNS = (
+    r'\*\*(?P<bold>.+?)\*\*',
+    r'<\|(?P<empty_link>More Info)>',
+    r'\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)]+)\)',
+)
+_INLINE_RE = re.compile('|'.join(_INLINE_PATTERNS))
+
+# Headings plus the inline patterns, so the summary is rewritten in a single pass
+_FORMAT_RE = re.compile(
+    r'(?P<heading>^\s*###\s+(?P<heading_text>.*))|' + '|'.join(_INLINE_PATTERNS),
+    re.MULTILINE
+)
+_SPCMD_RE = re.compile(r'SPC MD \d')
+
+def _inline_replacer(match):
+    """
+    Rewrite one inline Markdown construct, including any nested inside it.
+    """
+    if match.group('bold') is not None:
+        return f"*{_INLINE_RE.sub(_inline_replacer, match.group('bold'))}*"
+    if match.group('empty_link') is not None:
+        # Temporary placeholder that will be replaced with actual URLs
+        return f"<URL|{match.group('empty_link')}>"
+    url = _INLINE_RE.sub(_inline_replacer, match.group('link_url'))
+    text = _INLINE_RE.sub(_inline_replacer, match.group('link_text'))
+    return f"<{url}|{text}>"
+
+def _format_replacer(match):
+    """
+    Dispatch a _FORMAT_RE match to the heading or inline rewrite.
+    """
+    if match.lastgroup != 'heading':
+        return _inline_replacer(match)
+
+    heading_text = match.group('heading_text')
+    # Special handling for SPC MD messages - add emoji for weather alerts
+    if _SPCMD_RE.match(heading_text):
+        heading_text = "🌪️ " + heading_text
+    heading_text = heading_text.strip()
+
+    # Determine appropriate emoji based on disaster type
+    emoji = _classify_heading(heading_text)
+
+    # Inline Markdown inside the heading line is rewritten as well
+    return _INLINE_RE.sub(_inline_replacer, f"*{emoji} {heading_text}*")
+
 def format_alert_block(summary):
     """
     Format the summary for Slack Block Kit with enhanced disaster-specific formatting.
@@ -17,75 +99,10 @@ def format_alert_block(summary):
     if len(summary) > max_len:
         summary = summary[:max_len] + "..."
 
-    # Add emoji based on disaster type in heading
-    def heading_replacer(match):
-        heading_text = match.group(1).strip()
-        
-        # Determine appropriate emoji based on disaster type
-        emoji = "🌐"  # Default emoji
-        
-        if re.search(r'earthquake', heading_text, re.IGNORECASE):
-            emoji = "🌍"  # Changed from 🌋 to 🌍 for earthquake
-        elif re.search(r'flood', heading_text, re.IGNORECASE):
-            emoji = "🌊"
-        elif re.search(r'fire|wildfire', heading_text, re.IGNORECASE):
-            emoji = "🔥"
-        elif re.search(r'hurricane|cyclone|typhoon', heading_text, re.IGNORECASE):
-            emoji = "🌀"
-        elif re.search(r'tornado', heading_text, re.IGNORECASE):
-            emoji = "🌪️"
-        elif re.search(r'storm|thunder|lightning', heading_text, re.IGNORECASE):
-            emoji = "⛈️"
-        elif re.search(r'volcano|eruption', heading_text, re.IGNORECASE):
-            emoji = "🌋"
-        elif re.search(r'snow|blizzard|winter', heading_text, re.IGNORECASE):
-            emoji = "❄️"
-        elif re.search(r'drought|heat', heading_text, re.IGNORECASE):
-            emoji = "☀️"
-        elif re.search(r'MD \d+|Discussion', heading_text, re.IGNORECASE):
-            emoji = "🌪️"  # SPC Mesoscale Discussions often relate to severe weather
-        elif re.search(r'warning|advisory|watch', heading_text, re.IGNORECASE):
-            emoji = "⚠️"
-            
-        return f"*{emoji} {heading_text}*"
-
-    # Special handling for SPC MD messages - add emoji for weather alerts
-    summary = re.sub(
-        r"^\s*###\s+(SPC MD \d+)", 
-        r"### 🌪️ \1", 
-        summary,
-        flags=re.MULTILINE
-    )
-
-    # 2. Turn lines starting with '### ' into bold lines with emoji
-    summary = re.sub(
-        r'^\s*###\s+(.*)',
-        heading_replacer,
-        summary,
-        flags=re.MULTILINE
-    )
-
-    # 3. Convert '**some text**' into '*some text*' for Slack bold
-    summary = re.sub(
-        r'\*\*(.+?)\*\*',
-        r'*\1*',
-        summary
-    )
-    
-    # 4. Fix Slack link formatting - ensure proper format <url|text>
-    # First, fix any instances of <|More Info> that should be proper links
-    summary = re.sub(
-        r'<\|(More Info)>',
-        r'<URL|\1>',  # Temporary placeholder that will be replaced with actual URLs
-        summary
-    )
-    
-    # Also fix any markdown links [text](url)
-    summary = re.sub(
-        r'\[([^\]]+)\]\(([^)]+)\)',
-        r'<\2|\1>',
-        summary
-    )
+    # Rewrite headings (with disaster emoji), bold text and links in one pass,
+    # skipped entirely when the summary contains none of their markers
+    if '###' in summary or '**' in summary or '<|' in summary or '](' in summary:
+        summary = _FORMAT_RE.sub(_format_replacer, summary)
 
     # Create blocks with dividers between sections
     sections = summary.split('---')
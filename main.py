@@ -3,14 +3,14 @@
 from fetch_feeds import fetch_rss_feeds, RSS_FEEDS
 from process_data import process_disasters
 from format_message import format_alert_block
-from send_to_slack import send_disaster_alert_block
+from send_to_slack import send_disaster_alert_block, submit, flush_now, SendOutcome
 import os
 from dotenv import load_dotenv
-import schedule
 import time
 import sqlite3
 import logging
 import json
+import hashlib
 
 # Load environment variables
 load_dotenv()
@@ -28,91 +28,163 @@ logging.basicConfig(
 # Database path
 DB_PATH = 'disaster_alert_bot.db'
 
-def initialize_db():
+def _connect_db(db_path):
+    """
+    Open the long-lived database connection shared by every scheduled run.
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
+# Single database connection, reused instead of reconnecting in every helper
+_DB = _connect_db(DB_PATH)
+
+def link_hash(link):
+    """
+    Return the fixed-size 16-byte key under which a link is stored in sent_entries.
+    """
+    return hashlib.blake2b(link.encode('utf-8'), digest_size=16).digest()
+
+def _migrate_sent_entries(cursor):
+    """
+    Re-key a pre-1.2.0 sent_entries table (full URL as primary key) by link hash.
+    
+    Also finishes a migration that was interrupted after the old table had been
+    renamed to sent_entries_old, so its history is not left behind. Must run inside
+    the caller's transaction, so a failed migration leaves the old table untouched.
+    """
+    tables = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'sent_entries_old' not in tables:
+        if 'sent_entries' not in tables:
+            return
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(sent_entries)')]
+        if 'link_hash' in columns:
+            return
+        cursor.execute('ALTER TABLE sent_entries RENAME TO sent_entries_old')
+    else:
+        logging.warning("Found sent_entries_old from an interrupted migration; finishing it.")
+    
+    # The index moved with the renamed table; initialize_db recreates it on the new one
+    cursor.execute('DROP INDEX IF EXISTS idx_timestamp')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sent_entries (
+            link_hash BLOB PRIMARY KEY,
+            link TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    rows = cursor.execute('SELECT link, timestamp FROM sent_entries_old').fetchall()
+    cursor.executemany('INSERT OR IGNORE INTO sent_entries (link_hash, link, timestamp) VALUES (?, ?, ?)',
+                       [(link_hash(link), link, timestamp) for link, timestamp in rows])
+    cursor.execute('DROP TABLE sent_entries_old')
+    logging.info(f"Migrated {len(rows)} sent entries to hashed link keys.")
+
+def initialize_db(conn=_DB):
     """
     Initialize the SQLite database and create tables if they don't exist.
     Adds a timestamp column for tracking entry creation.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sent_entries (
-                link TEXT PRIMARY KEY,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        with conn:
+            cursor = conn.cursor()
+            # sqlite3 does not open a transaction before DDL on its own, so start one
+            # explicitly; the migration and schema setup then commit or roll back together
+            if not conn.in_transaction:
+                cursor.execute('BEGIN')
+            _migrate_sent_entries(cursor)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sent_entries (
+                    link_hash BLOB PRIMARY KEY,
+                    link TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
         
-        # Add index for faster queries
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_timestamp ON sent_entries(timestamp)
-        ''')
+            # Add index for faster queries
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_timestamp ON sent_entries(timestamp)
+            ''')
         
-        # Create a table for metadata (including version info)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS metadata (
-                key TEXT PRIMARY KEY,
-                value TEXT
-            )
-        ''')
+            # Create a table for metadata (including version info)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS metadata (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
         
-        # Set version info if not exists
-        cursor.execute('INSERT OR IGNORE INTO metadata (key, value) VALUES (?, ?)', 
-                      ('version', '1.1.0'))
+            # Cache of feed validators (ETag/Last-Modified) for conditional GET
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS feed_cache (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    body BLOB,
+                    fetched_at DATETIME
+                )
+            ''')
+        
+            # Record the schema version
+            cursor.execute('INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)', 
+                          ('version', '1.2.0'))
         
-        conn.commit()
-        conn.close()
         logging.info("Database initialized successfully.")
     except Exception as e:
         logging.error(f"Error initializing database: {e}")
 
-def cleanup_old_entries():
+def cleanup_old_entries(conn=_DB):
     """
     Clean up entries older than 30 days to prevent database bloat.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute('''
-            DELETE FROM sent_entries
-            WHERE timestamp < datetime('now', '-30 day')
-        ''')
+        with conn:
+            cursor = conn.execute('''
+                DELETE FROM sent_entries
+                WHERE timestamp < datetime('now', '-30 day')
+            ''')
         deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
         if deleted_count > 0:
             logging.info(f"Cleaned up {deleted_count} old entries from the database.")
     except Exception as e:
         logging.error(f"Error cleaning up old entries: {e}")
 
-def load_sent_entries():
+def find_unsent_links(links, conn=_DB):
     """
-    Load sent entries from the database to avoid duplicates.
+    Return the subset of links that are not yet in sent_entries.
+
+    The candidate links are anti-joined against sent_entries by link hash inside
+    SQLite, so the full history never has to be loaded into memory.
     """
+    if not links:
+        return set()
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute('SELECT link FROM sent_entries')
-        rows = cursor.fetchall()
-        conn.close()
-        sent_entries = set(row[0] for row in rows)
-        logging.info(f"Loaded {len(sent_entries)} sent entries from the database.")
-        return sent_entries
+        with conn:
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS candidates (link_hash BLOB PRIMARY KEY, link TEXT)')
+            conn.execute('DELETE FROM candidates')
+            conn.executemany('INSERT OR IGNORE INTO candidates (link_hash, link) VALUES (?, ?)',
+                             [(link_hash(link), link) for link in links])
+            unsent_links = {row[0] for row in conn.execute('''
+                SELECT c.link FROM candidates c
+                LEFT JOIN sent_entries s ON c.link_hash = s.link_hash
+                WHERE s.link_hash IS NULL
+            ''')}
+            conn.execute('DELETE FROM candidates')
+        logging.info(f"Found {len(unsent_links)} unsent links among {len(links)} fetched entries.")
+        return unsent_links
     except Exception as e:
-        logging.error(f"Error loading sent entries: {e}")
-        return set()
+        logging.error(f"Error checking sent entries: {e}")
+        return set(links)
 
-def save_sent_entries(new_links):
+def save_sent_entries(new_links, conn=_DB):
     """
-    Save new sent entries to the database.
+    Save new sent entries to the database in a single transaction.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.executemany('INSERT OR IGNORE INTO sent_entries (link, timestamp) VALUES (?, CURRENT_TIMESTAMP)', 
-                          [(link,) for link in new_links])
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.executemany('INSERT OR IGNORE INTO sent_entries (link_hash, link, timestamp) VALUES (?, ?, CURRENT_TIMESTAMP)', 
+                             [(link_hash(link), link) for link in new_links])
         logging.info(f"Saved {len(new_links)} new sent entries to the database.")
     except Exception as e:
         logging.error(f"Error saving sent entries: {e}")
@@ -123,18 +195,20 @@ def main():
     """
     logging.info("Starting disaster report processing...")
     
+    # Let the previous run's alert finish sending, so its links are recorded before
+    # deciding what is new. It has had a whole job interval, so this rarely waits.
+    flush_now()
+    
     # Clean up old entries periodically
     cleanup_old_entries()
     
-    # Load previously sent entries
-    sent_entries = load_sent_entries()
-    
     # Fetch disaster reports from RSS feeds
-    disasters = fetch_rss_feeds(RSS_FEEDS)
+    disasters = fetch_rss_feeds(RSS_FEEDS, db=_DB)
     logging.info(f"Fetched {len(disasters)} disaster reports from RSS feeds.")
     
     # Filter out already sent entries
-    new_disasters = [d for d in disasters if d['link'] not in sent_entries]
+    unsent_links = find_unsent_links([d['link'] for d in disasters])
+    new_disasters = [d for d in disasters if d['link'] in unsent_links]
     
     if not new_disasters:
         logging.info("No new disaster reports to process.")
@@ -148,17 +222,27 @@ def main():
     if summary:
         # Format and send the alert to Slack
         formatted_blocks = format_alert_block(summary)
-        logging.debug("Formatted blocks to be sent to Slack:")
-        logging.debug(json.dumps(formatted_blocks, indent=2))
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("Formatted blocks to be sent to Slack: %s", json.dumps(formatted_blocks))
         
-        # Send the alert to Slack
-        send_disaster_alert_block(formatted_blocks)
-        
-        # Update sent entries in the database
         new_links = [d['link'] for d in new_disasters]
-        save_sent_entries(new_links)
         
-        logging.info("Disaster alert sent to Slack successfully.")
+        def on_sent(outcome):
+            # Record the entries once Slack has the alert, or once it has been rejected
+            # for good (bad blocks, auth, channel), which a later run would only repeat.
+            # After a transient failure they are left unrecorded and retried next run.
+            if outcome is SendOutcome.SENT:
+                save_sent_entries(new_links)
+                logging.info("Disaster alert sent to Slack successfully.")
+            elif outcome is SendOutcome.FAILED:
+                save_sent_entries(new_links)
+                logging.error("Disaster alert could not be delivered to Slack and will not be retried.")
+            else:
+                logging.error("Failed to send disaster alert to Slack; entries will be retried next run.")
+        
+        # Hand the alert to the background sender rather than waiting on Slack here
+        submit(formatted_blocks, on_sent=on_sent)
+        logging.info("Disaster alert queued for Slack.")
     else:
         logging.warning("No summary generated - no alert sent.")
 
@@ -191,6 +275,31 @@ def job():
         except Exception as slack_error:
             logging.error(f"Failed to send error notification to Slack: {slack_error}")
 
+def run_scheduler(job_interval_minutes):
+    """
+    Run the job immediately, then every job_interval_minutes until the process exits.
+    
+    Runs are anchored to fixed monotonic deadlines, and the loop sleeps until the
+    next one is due instead of waking up every second to poll. If a run overruns
+    one or more intervals, the missed runs are skipped rather than run back-to-back.
+    """
+    interval = job_interval_minutes * 60
+    next_run = time.monotonic()
+    
+    job()
+    logging.info(f"Disaster Alert Bot is running... Scheduled to run every {job_interval_minutes} minutes.")
+    
+    while True:
+        next_run += interval
+        now = time.monotonic()
+        if next_run <= now:
+            missed = int((now - next_run) // interval) + 1
+            logging.warning(f"Job overran its interval; skipping {missed} scheduled run(s).")
+            next_run += missed * interval
+        
+        time.sleep(max(0, next_run - time.monotonic()))
+        job()
+
 if __name__ == "__main__":
     # Initialize the database
     initialize_db()
@@ -204,14 +313,5 @@ if __name__ == "__main__":
         logging.error(f"Invalid JOB_INTERVAL_MINUTES value: {ve}. Using default interval of 10 minutes.")
         job_interval_minutes = 10
     
-    # Run the job immediately on startup
-    job()
-    
-    # Schedule the job based on the loaded interval
-    schedule.every(job_interval_minutes).minutes.do(job)
-
-    logging.info(f"Disaster Alert Bot is running... Scheduled to run every {job_interval_minutes} minutes.")
-    
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
\ No newline at end of file
+    # Run the job immediately on startup, then on the loaded interval
+    run_scheduler(job_interval_minutes)
\ No newline at end of file
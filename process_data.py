@@ -6,12 +6,29 @@ import re  # Make sure this import is present
 from openai import OpenAI, APIError, APIConnectionError, RateLimitError
 from fetch_feeds import fetch_rss_feeds
 from dotenv import load_dotenv
-from collections import defaultdict
 import datetime
 import logging
 import time
+import random
+import functools
+import enum
+import hashlib
+import collections
+import threading
+import html
+import sqlite3
 from send_to_slack import send_disaster_alert_block
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson is optional; it decodes the batch extraction responses faster when installed.
+# Its JSONDecodeError subclasses json.JSONDecodeError, so error handling is unchanged.
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,6 +37,12 @@ load_dotenv()
 MODEL_NAME = os.getenv("MODEL_NAME", "gpt-5-mini")
 EXTRACTION_MODEL = os.getenv("EXTRACTION_MODEL", "gpt-5-mini")  # Use gpt-5-mini for extraction
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "10"))  # Number of entries to process in a single API call
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))  # Extraction batches sent to the API at once
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.db")  # Persistent cache of extraction results
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "200000"))  # Tokens per minute allowed across all workers (0 disables)
+
+# Upper bound in seconds for a single retry backoff
+MAX_BACKOFF = 60
 
 # GPT-5 specific settings
 REASONING_EFFORT_EXTRACTION = os.getenv("REASONING_EFFORT_EXTRACTION", "low")
@@ -40,174 +63,377 @@ client = OpenAI(
     api_key=os.getenv("OPENAI_API_KEY")
 )
 
-def normalize_date(date_str):
-    """
-    Normalize various date formats to ISO 8601 (YYYY-MM-DD).
-    """
-    # Handle None or empty strings
-    if not date_str:
-        return 'Unknown Date'
-        
-    # Try various date formats
-    for fmt in (
-        '%a, %d %b %Y %H:%M:%S %Z',  # RFC 822 format
+# Patterns used on every entry, compiled once at import
+_DATE_FALLBACK_RE = re.compile(r'(\d{4}[-/]\d{1,2}[-/]\d{1,2})')
+_ALERTLEVEL_GREEN_RE = re.compile(r'alertlevel\s*>\s*green', re.IGNORECASE)
+_MAGNITUDE_RE = re.compile(r'(?:^|\s)(?:m|magnitude)\s*(\d+\.?\d*)', re.IGNORECASE)
+_MD_NUMBER_RE = re.compile(r'md\s+(\d+)')
+_HTML_TAG_RE = re.compile(r'<[a-zA-Z/!][^>]*>')  # Unbounded, since real tags (img with style) can be long
+# Fixed keywords the prefilter looks for, fused so a title or link is scanned once
+_TITLE_KEYWORD_RE = re.compile(
+    r'(?P<spc_md>^spc md)|(?P<green_start>^green )|(?P<green_alert>green alert)'
+    r'|(?P<green_earthquake>green earthquake)|(?P<outlook>outlook)'
+)
+_LINK_KEYWORD_RE = re.compile(r'(?P<md>/md/)|(?P<outlook>/outlook/)')
+_NUMERIC_RE = re.compile(r'^\d+(?:\.\d+)?$')
+
+# Entry keys under which feed parsers expose the GDACS alert level
+_GDACS_ALERT_KEYS = frozenset(('gdacs_alertlevel', 'gdacs:alertlevel', 'alertlevel'))
+
+# Date shapes recognised by normalize_date, each mapped to the only formats that can
+# match it (strptime is case-insensitive and lets %d be a space-padded digit)
+_DATE_SHAPE_RE = re.compile(
+    r'(?P<iso_time>\d{4}-\d{1,2}-\s?\d{1,2}T)'
+    r'|(?P<iso_space>\d{4}-\d{1,2}-\s?\d{1,2}\s)'
+    r'|(?P<iso_date>\d{4}-\d{1,2}-\s?\d{1,2}$)'
+    r'|(?P<slash>\s?\d{1,2}/)'
+    r'|(?P<day_month>\s?\d{1,2}\s)'
+    r'|(?P<named>[a-z])',
+    re.IGNORECASE
+)
+_DATE_FORMATS = {
+    'iso_time': (
         '%Y-%m-%dT%H:%M:%SZ',        # ISO 8601 with Z
         '%Y-%m-%dT%H:%M:%S%z',       # ISO 8601 with timezone offset
+    ),
+    'iso_space': (
         '%Y-%m-%d %H:%M:%S UTC',     # Custom UTC format
         '%Y-%m-%d %H:%M:%S',         # Standard datetime
+    ),
+    'iso_date': (
         '%Y-%m-%d',                  # Just date
-        '%d %b %Y',                  # 25 Dec 2023
-        '%B %d, %Y',                 # December 25, 2023
+    ),
+    'slash': (
         '%m/%d/%Y',                  # MM/DD/YYYY
         '%d/%m/%Y',                  # DD/MM/YYYY
-    ):
-        try:
-            return datetime.datetime.strptime(date_str, fmt).strftime('%Y-%m-%d')
-        except (ValueError, TypeError):
-            continue
+    ),
+    'day_month': (
+        '%d %b %Y',                  # 25 Dec 2023
+    ),
+    'named': (
+        '%a, %d %b %Y %H:%M:%S %Z',  # RFC 822 format
+        '%B %d, %Y',                 # December 25, 2023
+    ),
+}
+
+def _backoff_delay(backoff_factor, attempt):
+    """
+    Return a jittered exponential backoff delay, so concurrent workers that failed
+    together (e.g. on a rate limit) do not all retry at the same moment.
+    """
+    return min(MAX_BACKOFF, backoff_factor ** attempt * (0.5 + random.random()))
+
+class _TokenWindow:
+    """
+    Sliding one-minute window of tokens sent to the API, shared by every worker,
+    so concurrent batches wait their turn instead of overrunning the account's
+    tokens-per-minute limit and failing together with 429s.
+    """
+    WINDOW_SECONDS = 60
+    
+    def __init__(self, limit):
+        self.limit = limit
+        self._sent = collections.deque()  # [timestamp, tokens] per request
+        self._total = 0
+        self._lock = threading.Lock()
+    
+    def _prune(self, now):
+        while self._sent and now - self._sent[0][0] >= self.WINDOW_SECONDS:
+            self._total -= self._sent.popleft()[1]
+    
+    def reserve(self, tokens):
+        """
+        Block until the window has room for an estimated number of tokens, then
+        record them. Returns a handle for record_usage.
+        """
+        if self.limit <= 0:
+            return None
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._prune(now)
+                # A request larger than the whole budget still goes through once the window is empty
+                if not self._sent or self._total + tokens <= self.limit:
+                    record = [now, tokens]
+                    self._sent.append(record)
+                    self._total += tokens
+                    return record
+                wait = self.WINDOW_SECONDS - (now - self._sent[0][0])
+            logging.info(f"Waiting {wait:.1f}s for OpenAI tokens-per-minute budget")
+            time.sleep(wait)
+    
+    def record_usage(self, record, tokens):
+        """
+        Replace a reservation's estimate with the tokens the API reported using.
+        """
+        if record is None or not tokens:
+            return
+        with self._lock:
+            if any(r is record for r in self._sent):
+                self._total += tokens - record[1]
+            record[1] = tokens
+
+_TOKEN_WINDOW = _TokenWindow(OPENAI_TPM_LIMIT)
+
+# Rough token estimates made before a request: about 4 characters per input token,
+# plus room for each alert's JSON result (and reasoning) in the output
+_CHARS_PER_TOKEN = 4
+_OUTPUT_TOKENS_PER_ENTRY = 200
+
+def _estimate_tokens(*texts, expected_output=0):
+    """
+    Estimate the tokens a request will count against the per-minute limit.
+    """
+    return sum(len(text) for text in texts) // _CHARS_PER_TOKEN + expected_output
+
+def _create_response(estimated_tokens, **kwargs):
+    """
+    Call client.responses.create once the tokens-per-minute window has room.
+    """
+    record = _TOKEN_WINDOW.reserve(estimated_tokens)
+    response = client.responses.create(**kwargs)
+    usage = getattr(response, "usage", None)
+    _TOKEN_WINDOW.record_usage(record, getattr(usage, "total_tokens", None))
+    return response
+
+def normalize_date(date_str):
+    """
+    Normalize various date formats to ISO 8601 (YYYY-MM-DD).
+    """
+    # Handle None or empty strings
+    if not date_str:
+        return 'Unknown Date'
+    return _normalize_date_cached(date_str)
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_date_cached(date_str):
+    """
+    Normalize a non-empty date string. Cached, since the same published dates are
+    normalized repeatedly across batches, retries and fallbacks.
+    """
+    # Classify the date's shape once, then only try the formats for that shape
+    shape = _DATE_SHAPE_RE.match(date_str)
+    if shape:
+        for fmt in _DATE_FORMATS[shape.lastgroup]:
+            try:
+                return datetime.datetime.strptime(date_str, fmt).strftime('%Y-%m-%d')
+            except (ValueError, TypeError):
+                continue
             
     # Check for special patterns like "Updated: 2023-12-25"
-    date_match = re.search(r'(\d{4}[-/]\d{1,2}[-/]\d{1,2})', date_str)
+    date_match = _DATE_FALLBACK_RE.search(date_str)
     if date_match:
         try:
             extracted_date = date_match.group(1).replace('/', '-')
-            return normalize_date(extracted_date)  # Recursively normalize this extracted date
+            return datetime.datetime.strptime(extracted_date, '%Y-%m-%d').strftime('%Y-%m-%d')
         except (ValueError, TypeError):
             pass
             
     # If all attempts fail
     return 'Unknown Date'
 
-def should_filter_entry(entry, entry_details=None):
+class FilterDecision(enum.Enum):
     """
-    Determine if an entry should be filtered out based on severity/magnitude.
-    Returns True if entry should be filtered out, False if it should be kept.
+    Outcome of the entry-only filter stage.
+    """
+    DROP = "drop"        # Filtered out from the entry's own title/link/XML signals
+    UNKNOWN = "unknown"  # Needs the LLM-extracted details to decide
+
+def _entry_fields(entry):
+    """
+    Return the lowercased (source_type, title, link) fields the filters test.
+    """
+    return (
+        (entry.get("source_type") or "").lower(),
+        (entry.get("title") or "").lower(),
+        (entry.get("link") or "").lower(),
+    )
+
+def _keyword_hits(pattern, text):
+    """
+    Return the names of the keyword groups of pattern that occur in text.
+    """
+    return {m.lastgroup for m in pattern.finditer(text)}
+
+def _prefilter(entry):
+    """
+    Run the filter steps that only need the entry itself, before any LLM extraction.
+    Returns a FilterDecision; UNKNOWN entries still need the detail-based checks.
     """
     # Guard against None values
     if entry is None:
         logging.warning("Received None entry in should_filter_entry")
-        return True
+        return FilterDecision.DROP
+        
+    if not isinstance(entry, dict):
+        logging.warning(f"Received non-dict entry in should_filter_entry: {type(entry)}")
+        return FilterDecision.DROP
         
-    source_type = entry.get("source_type", "").lower() if isinstance(entry, dict) else ""
-    title = entry.get("title", "").lower() if isinstance(entry, dict) else ""
-    summary = entry.get("summary", "").lower() if isinstance(entry, dict) else ""
-    link = entry.get("link", "").lower() if isinstance(entry, dict) else ""
+    source_type, title, link = _entry_fields(entry)
     
     # NOAA SPC specific filtering
     if source_type == "noaa_spc":
+        title_hits = _keyword_hits(_TITLE_KEYWORD_RE, title)
+        link_hits = _keyword_hits(_LINK_KEYWORD_RE, link)
+        
         # Filter out Mesoscale Discussions
-        if "/md/" in link or title.startswith("spc md"):
+        if "md" in link_hits or "spc_md" in title_hits:
             logging.info(f"Filtering out SPC Mesoscale Discussion: {title}")
-            return True
+            return FilterDecision.DROP
             
         # Filter out Outlook reports
-        if "/outlook/" in link or "outlook" in title.lower():
+        if "outlook" in link_hits or "outlook" in title_hits:
             logging.info(f"Filtering out SPC Outlook report: {title}")
-            return True
+            return FilterDecision.DROP
             
     # GDACS specific filtering - CRITICAL: Check different ways to identify GDACS green alerts
     if source_type == "gdacs":
+        title_hits = _keyword_hits(_TITLE_KEYWORD_RE, title)
+        
         # 1. Check title - most GDACS alerts start with their level in the title
-        if title.startswith("green "):
+        if "green_start" in title_hits:
             logging.info(f"Filtering out GDACS green alert from title start: {title}")
-            return True
+            return FilterDecision.DROP
             
-        # 2. Check keyword in title or summary
-        if "green alert" in title or "green alert" in summary:
+        # 2. Check keyword in title or summary (the summary is only lowered if the title has no match)
+        if "green_alert" in title_hits or "green alert" in (entry.get("summary") or "").lower():
             logging.info(f"Filtering out GDACS green alert from title/summary content: {title}")
-            return True
+            return FilterDecision.DROP
             
         # 3. Check if XML data is available directly - this depends on feedparser structure
-        if isinstance(entry, dict):
-            # Try to access GDACS namespace elements if available
-            for k, v in entry.items():
-                if 'alertlevel' in k.lower() and isinstance(v, str) and v.lower() == 'green':
-                    logging.info(f"Filtering out GDACS green alert from XML element: {title}")
-                    return True
-
-        # 4. Check if entry has raw XML content to parse
-        raw_xml = str(entry)
-        if 'alertlevel' in raw_xml.lower() and 'green' in raw_xml.lower():
-            # Look for patterns like alertlevel>Green or AlertLevel>Green
-            if re.search(r'alertlevel\s*>\s*green', raw_xml, re.IGNORECASE):
-                logging.info(f"Filtering out GDACS green alert from raw XML content: {title}")
-                return True
-                
-        # 5. Use LLM-extracted details as final check
-        if entry_details and isinstance(entry_details, dict):
-            alert_level = entry_details.get("alert_level", "").lower()
-            if alert_level == "green":
-                logging.info(f"Filtering out GDACS green alert from LLM extraction: {title} (Level: {alert_level})")
-                return True
+        # 4. Check for raw XML embedded in a field, e.g. alertlevel>Green or AlertLevel>Green
+        # Both run in one pass over the fields; an XML element match takes precedence
+        raw_xml_green = False
+        for k, v in entry.items():
+            if not isinstance(v, str):
+                continue
+            if k in _GDACS_ALERT_KEYS and v.lower() == 'green':
+                logging.info(f"Filtering out GDACS green alert from XML element: {title}")
+                return FilterDecision.DROP
+            if not raw_xml_green and _ALERTLEVEL_GREEN_RE.search(v):
+                raw_xml_green = True
+        if raw_xml_green:
+            logging.info(f"Filtering out GDACS green alert from raw XML content: {title}")
+            return FilterDecision.DROP
                 
         # 6. Fallback approach - if title contains "Green earthquake" pattern
-        if "green earthquake" in title:
+        if "green_earthquake" in title_hits:
             logging.info(f"Filtering out GDACS green earthquake from title pattern: {title}")
-            return True
+            return FilterDecision.DROP
             
         # 7. Parse for green icon URL
-        if isinstance(entry, dict) and 'icon' in entry:
-            icon_url = entry.get('icon', '')
-            if 'green' in icon_url.lower() and 'eq' in icon_url.lower():
+        if 'icon' in entry:
+            icon_url = (entry.get('icon') or '').lower()
+            if 'green' in icon_url and 'eq' in icon_url:
                 logging.info(f"Filtering out GDACS green alert from icon URL: {title}")
-                return True
-            
-        # 8. For GDACS earthquakes, also apply magnitude threshold
-        if entry_details and isinstance(entry_details, dict):
-            disaster_type = entry_details.get("disaster_type", "").lower()
-            if disaster_type == "earthquake":
-                magnitude = entry_details.get("severity", "")
-                if isinstance(magnitude, str) and magnitude.replace('.', '').isdigit():
-                    try:
-                        magnitude = float(magnitude)
-                        if magnitude < 6.0:
-                            logging.info(f"Filtering out low magnitude GDACS earthquake: {title} (M{magnitude})")
-                            return True
-                    except ValueError:
-                        pass
+                return FilterDecision.DROP
     
     # USGS specific filtering for earthquakes
     elif source_type == "usgs":
         # Try to extract magnitude from USGS title (they often start with magnitude)
-        magnitude_match = re.search(r'(?:^|\s)(?:m|magnitude)\s*(\d+\.?\d*)', title, re.IGNORECASE)
+        magnitude_match = _MAGNITUDE_RE.search(title)
         if magnitude_match:
             try:
                 magnitude = float(magnitude_match.group(1))
                 if magnitude < 5.8:
                     logging.info(f"Filtering out low magnitude USGS earthquake from title: {title} (M{magnitude})")
-                    return True
+                    return FilterDecision.DROP
             except (ValueError, IndexError):
                 pass
             
         # If no match in title, try summary
         if not magnitude_match:
-            magnitude_match = re.search(r'(?:^|\s)(?:m|magnitude)\s*(\d+\.?\d*)', summary, re.IGNORECASE)
+            # The pattern is case-insensitive, so the summary does not need lowering
+            magnitude_match = _MAGNITUDE_RE.search(entry.get("summary") or "")
             if magnitude_match:
                 try:
                     magnitude = float(magnitude_match.group(1))
                     if magnitude < 5.8:
                         logging.info(f"Filtering out low magnitude USGS earthquake from summary: {title} (M{magnitude})")
-                        return True
+                        return FilterDecision.DROP
+                    # A summary can mention other magnitudes (e.g. a past quake), so a
+                    # high one here is left for the check against the extracted details
                 except (ValueError, IndexError):
                     pass
+    
+    # If we've made it here, the entry shouldn't be filtered on its own signals
+    return FilterDecision.UNKNOWN
+
+def _postfilter_with_details(entry, entry_details):
+    """
+    Run the filter steps that need LLM-extracted details. Only entries that
+    were left UNKNOWN by _prefilter reach this, so it does not repeat those checks.
+    Returns True if entry should be filtered out, False if it should be kept.
+    """
+    if not entry_details or not isinstance(entry_details, dict):
+        return False
         
-        # Use LLM-extracted info for USGS as a backup
-        if entry_details and isinstance(entry_details, dict):
-            disaster_type = entry_details.get("disaster_type", "").lower()
-            if disaster_type == "earthquake":
-                magnitude = entry_details.get("severity", "")
-                if isinstance(magnitude, str) and magnitude.replace('.', '').isdigit():
-                    try:
-                        magnitude = float(magnitude)
-                        if magnitude < 5.8:
-                            logging.info(f"Filtering out low magnitude USGS earthquake from LLM: {title} (M{magnitude})")
-                            return True
-                    except ValueError:
-                        pass
-    
-    # If we've made it here, the entry shouldn't be filtered
+    source_type, title, _ = _entry_fields(entry)
+    
+    if source_type == "gdacs":
+        # 5. Use LLM-extracted details as final check
+        alert_level = entry_details.get("alert_level", "").lower()
+        if alert_level == "green":
+            logging.info(f"Filtering out GDACS green alert from LLM extraction: {title} (Level: {alert_level})")
+            return True
+                
+        # 8. For GDACS earthquakes, also apply magnitude threshold
+        disaster_type = entry_details.get("disaster_type", "").lower()
+        if disaster_type == "earthquake":
+            magnitude = entry_details.get("severity", "")
+            if isinstance(magnitude, str) and _NUMERIC_RE.match(magnitude):
+                magnitude = float(magnitude)
+                if magnitude < 6.0:
+                    logging.info(f"Filtering out low magnitude GDACS earthquake: {title} (M{magnitude})")
+                    return True
+    
+    # Use LLM-extracted info for USGS as a backup
+    elif source_type == "usgs":
+        disaster_type = entry_details.get("disaster_type", "").lower()
+        if disaster_type == "earthquake":
+            magnitude = entry_details.get("severity", "")
+            if isinstance(magnitude, str) and _NUMERIC_RE.match(magnitude):
+                magnitude = float(magnitude)
+                if magnitude < 5.8:
+                    logging.info(f"Filtering out low magnitude USGS earthquake from LLM: {title} (M{magnitude})")
+                    return True
+    
     return False
 
+def should_filter_entry(entry, entry_details=None):
+    """
+    Determine if an entry should be filtered out based on severity/magnitude.
+    Returns True if entry should be filtered out, False if it should be kept.
+    """
+    decision = _prefilter(entry)
+    if decision is FilterDecision.UNKNOWN:
+        return _postfilter_with_details(entry, entry_details)
+    return decision is FilterDecision.DROP
+
+def _html_to_text(raw_html):
+    """
+    Strip tags from an HTML fragment, joining its text pieces with spaces.
+    """
+    root = lxml.html.fragment_fromstring(raw_html, create_parent='div')
+    # Script and style contents are not visible text
+    etree.strip_elements(root, 'script', 'style', with_tail=False)
+    return ' '.join(root.itertext())
+
+# Summaries with fewer '<' than this and no script/style block skip the HTML parser
+_SIMPLE_HTML_MAX_TAGS = 4
+_SCRIPT_STYLE_RE = re.compile(r'<(?:script|style)\b', re.IGNORECASE)
+
+def _simple_html_to_text(raw_html):
+    """
+    Strip tags from trivial markup (e.g. a single <p> or <br>) without building a
+    DOM, joining the text pieces with spaces like _html_to_text. Falls back to the
+    parser if anything tag-like survives the split (e.g. an unterminated tag).
+    """
+    text = ' '.join(piece for piece in _HTML_TAG_RE.split(raw_html) if piece)
+    if '<' in text:
+        return _html_to_text(raw_html)
+    return html.unescape(text)
+
 def prepare_entry_for_extraction(entry):
     """
     Prepare an entry for extraction by cleaning its fields.
@@ -216,9 +442,13 @@ def prepare_entry_for_extraction(entry):
     title = entry.get('title', '')
     raw_summary = entry.get('summary', '')
     
-    if isinstance(raw_summary, str) and (raw_summary.startswith('<') or '<' in raw_summary):
+    # Only parse summaries that contain an actual tag, not just a stray '<' as in "M<6.0"
+    if isinstance(raw_summary, str) and _HTML_TAG_RE.search(raw_summary):
         try:
-            summary = BeautifulSoup(raw_summary, 'html.parser').get_text(separator=' ')
+            if raw_summary.count('<') < _SIMPLE_HTML_MAX_TAGS and not _SCRIPT_STYLE_RE.search(raw_summary):
+                summary = _simple_html_to_text(raw_summary)
+            else:
+                summary = _html_to_text(raw_summary)
         except Exception as e:
             logging.warning(f"Error parsing HTML summary: {e}")
             summary = raw_summary
@@ -238,21 +468,10 @@ def prepare_entry_for_extraction(entry):
         "published": published
     }
 
-def extract_details_in_batch(entries, max_retries=2, backoff_factor=2):
-    """
-    Extract structured disaster information for multiple entries using a single LLM call.
-    
-    Args:
-        entries: List of prepared entry dictionaries
-        
-    Returns:
-        Dictionary mapping entry IDs to their extracted details
-    """
-    if not entries:
-        return {}
-        
-    # Create a batch prompt
-    batch_prompt = """
+# Invariant field/format rules for batch extraction. Sent as the Responses API
+# instructions so every batch shares the same prefix and only the alerts vary.
+_EXTRACTION_INSTRUCTIONS = """Extract detailed disaster information from alerts and return as structured JSON. Focus on accuracy and consistency in field extraction. IMPORTANT: Return valid JSON only.
+
     Extract detailed information from each of the following disaster alerts.
     
     For each alert, extract these fields:
@@ -295,33 +514,74 @@ def extract_details_in_batch(entries, max_retries=2, backoff_factor=2):
     
     Here are the alerts to process:
     """
+
+# Source-specific guidance appended to each alert in the extraction prompt
+_SOURCE_TYPE_NOTES = {
+    "noaa_spc": "Note: This is from NOAA SPC. Look for severe weather details, affected regions, and MD numbers.\n",
+    "nhc": "Note: This is from NHC. Look for tropical cyclone information, basin, and formation probability.\n",
+    "usgs": "Note: This is from USGS. Extract the exact magnitude and location from earthquake reports. The magnitude is critical for filtering.\n",
+    "gdacs": "Note: This is from GDACS. Carefully extract the alert level (Green, Orange, Red) and include it in the alert_level field. Also extract the magnitude for earthquakes.\n",
+}
+
+def _fallback_details(entry):
+    """
+    Build placeholder details for a prepared entry the LLM returned nothing for.
+    """
+    summary = entry['summary']
+    return {
+        "disaster_type": "Unknown Type",
+        "location": "Unknown Location",
+        "date": normalize_date(entry['published']),
+        "severity": None,
+        "alert_level": "",  # Added alert_level field
+        "description": summary[:100] + "..." if len(summary) > 100 else summary
+    }
+
+def _extract_batch_results(entries, max_retries=2, backoff_factor=2):
+    """
+    Extract structured disaster information for multiple entries using a single LLM call.
+    
+    Args:
+        entries: List of prepared entry dictionaries
+        
+    Returns:
+        Dictionary mapping entry IDs to their extracted details. Entries the LLM
+        returned no result for are left out, so this is empty if every attempt failed.
+    """
+    if not entries:
+        return {}
+        
+    # Create a batch prompt holding only the per-entry data
+    prompt_parts = []
     
     # Add each entry to the prompt
     for i, entry in enumerate(entries):
-        batch_prompt += f"\n--- ALERT {i+1} (ID: {entry['id']}) ---\n"
-        batch_prompt += f"Source: {entry['source']}\n"
-        batch_prompt += f"Source Type: {entry['source_type']}\n"
-        batch_prompt += f"Title: {entry['title']}\n"
-        batch_prompt += f"Summary: {entry['summary']}\n"
-        batch_prompt += f"Published Date: {entry['published']}\n"
+        prompt_parts.append(
+            f"\n--- ALERT {i+1} (ID: {entry['id']}) ---\n"
+            f"Source: {entry['source']}\n"
+            f"Source Type: {entry['source_type']}\n"
+            f"Title: {entry['title']}\n"
+            f"Summary: {entry['summary']}\n"
+            f"Published Date: {entry['published']}\n"
+        )
         
         # Add source-specific guidance
-        if entry['source_type'] == "noaa_spc":
-            batch_prompt += "Note: This is from NOAA SPC. Look for severe weather details, affected regions, and MD numbers.\n"
-        elif entry['source_type'] == "nhc":
-            batch_prompt += "Note: This is from NHC. Look for tropical cyclone information, basin, and formation probability.\n"
-        elif entry['source_type'] == "usgs":
-            batch_prompt += "Note: This is from USGS. Extract the exact magnitude and location from earthquake reports. The magnitude is critical for filtering.\n"
-        elif entry['source_type'] == "gdacs":
-            batch_prompt += "Note: This is from GDACS. Carefully extract the alert level (Green, Orange, Red) and include it in the alert_level field. Also extract the magnitude for earthquakes.\n"
+        note = _SOURCE_TYPE_NOTES.get(entry['source_type'])
+        if note:
+            prompt_parts.append(note)
+    
+    batch_prompt = "".join(prompt_parts)
+    estimated_tokens = _estimate_tokens(_EXTRACTION_INSTRUCTIONS, batch_prompt,
+                                        expected_output=_OUTPUT_TOKENS_PER_ENTRY * len(entries))
     
     # Call the API with retries using the new Responses API
     for attempt in range(1, max_retries + 1):
         try:
-            response = client.responses.create(
+            response = _create_response(
+                estimated_tokens,
                 model=EXTRACTION_MODEL,
                 reasoning={"effort": REASONING_EFFORT_EXTRACTION},
-                instructions="Extract detailed disaster information from alerts and return as structured JSON. Focus on accuracy and consistency in field extraction. IMPORTANT: Return valid JSON only.",
+                instructions=_EXTRACTION_INSTRUCTIONS,
                 input=batch_prompt,
             )
             
@@ -329,7 +589,7 @@ def extract_details_in_batch(entries, max_retries=2, backoff_factor=2):
             
             try:
                 # Parse the JSON response
-                parsed_results = json.loads(result_text)
+                parsed_results = _json_loads(result_text)
                 
                 # The response could be in different formats - handle them appropriately
                 if isinstance(parsed_results, dict):
@@ -374,18 +634,6 @@ def extract_details_in_batch(entries, max_retries=2, backoff_factor=2):
                             "description": result.get("description", "")
                         }
                 
-                # Create fallback entries for any missing IDs
-                for entry in entries:
-                    if entry['id'] not in details_map:
-                        details_map[entry['id']] = {
-                            "disaster_type": "Unknown Type",
-                            "location": "Unknown Location",
-                            "date": normalize_date(entry['published']),
-                            "severity": None,
-                            "alert_level": "",  # Added alert_level field
-                            "description": entry['summary'][:100] + "..." if len(entry['summary']) > 100 else entry['summary']
-                        }
-                
                 logging.info(f"Successfully extracted details for {len(details_map)} entries in batch")
                 return details_map
                 
@@ -400,22 +648,30 @@ def extract_details_in_batch(entries, max_retries=2, backoff_factor=2):
             logging.error(f"Unexpected error extracting details: {e}")
         
         if attempt < max_retries:
-            sleep_time = backoff_factor ** attempt
+            sleep_time = _backoff_delay(backoff_factor, attempt)
             time.sleep(sleep_time)
     
-    # If all retries fail, create fallback details for all entries
-    fallback_details = {}
+    return {}
+
+def extract_details_in_batch(entries, max_retries=2, backoff_factor=2):
+    """
+    Extract structured disaster information for multiple entries using a single LLM call.
+    
+    Args:
+        entries: List of prepared entry dictionaries
+        
+    Returns:
+        Dictionary mapping entry IDs to their extracted details, with fallback
+        details for any entry the LLM returned nothing for
+    """
+    details_map = _extract_batch_results(entries, max_retries, backoff_factor)
+    
+    # Create fallback entries for any missing IDs (all of them if every retry failed)
     for entry in entries:
-        fallback_details[entry['id']] = {
-            "disaster_type": "Unknown Type",
-            "location": "Unknown Location",
-            "date": normalize_date(entry['published']),
-            "severity": None,
-            "alert_level": "",  # Added alert_level field
-            "description": entry['summary'][:100] + "..." if len(entry['summary']) > 100 else entry['summary']
-        }
+        if entry['id'] not in details_map:
+            details_map[entry['id']] = _fallback_details(entry)
     
-    return fallback_details
+    return details_map
 
 def extract_details_with_llm(entry, max_retries=2, backoff_factor=2):
     """
@@ -426,23 +682,140 @@ def extract_details_with_llm(entry, max_retries=2, backoff_factor=2):
     batch_results = extract_details_in_batch([prepared_entry], max_retries, backoff_factor)
     
     # Return the details for this entry, or a fallback if not found
-    return batch_results.get(prepared_entry['id'], {
-        "disaster_type": "Unknown Type",
-        "location": "Unknown Location",
-        "date": normalize_date(entry.get('published', '')),
-        "severity": None,
-        "alert_level": "",  # Added alert_level field
-        "description": prepared_entry['summary'][:100] + "..." if len(prepared_entry['summary']) > 100 else prepared_entry['summary']
-    })
+    details = batch_results.get(prepared_entry['id'])
+    return details if details is not None else _fallback_details(prepared_entry)
+
+# How long a cached extraction result is used, as an SQLite datetime modifier
+_LLM_CACHE_MAX_AGE = '-30 day'
+
+def _open_llm_cache(path):
+    """
+    Open the persistent cache of LLM extraction results, keyed by entry content.
+    Returns None if the cache is unavailable.
+    """
+    try:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+        return conn
+    except Exception as e:
+        logging.warning(f"LLM cache unavailable, extracting without it: {e}")
+        return None
+
+# Opened by _get_llm_cache on first use rather than at import, so importing this
+# module does not create the cache file or prune it
+_LLM_CACHE = None
+_llm_cache_opened = False
+_LLM_CACHE_LOCK = threading.Lock()
+
+def _get_llm_cache():
+    """
+    Return the LLM cache connection, opening it on first use (None if unavailable).
+    """
+    global _LLM_CACHE, _llm_cache_opened
+    with _LLM_CACHE_LOCK:
+        if not _llm_cache_opened:
+            _LLM_CACHE = _open_llm_cache(LLM_CACHE_PATH)
+            _llm_cache_opened = True
+    return _LLM_CACHE
+
+def _content_key(entry):
+    """
+    Return the cache key of a prepared entry: a hash of every field the extraction
+    sees apart from the link, since the same text from another source or with
+    another publication date can yield different details.
+    """
+    content = f"{entry['source_type']}|{entry['published']}|{entry['title']}|{entry['summary']}"
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+def _prune_llm_cache():
+    """
+    Drop cached results older than _LLM_CACHE_MAX_AGE. Runs on every
+    group_disasters call, so the cache stays bounded in a long-running scheduler.
+    """
+    cache = _get_llm_cache()
+    if cache is None:
+        return
+    try:
+        with cache:
+            cache.execute("DELETE FROM llm_cache WHERE created_at < datetime('now', ?)", (_LLM_CACHE_MAX_AGE,))
+    except Exception as e:
+        logging.warning(f"Error pruning the LLM cache: {e}")
+
+def _load_cached_details(keys):
+    """
+    Look up previously extracted details for the given content keys, ignoring
+    results older than _LLM_CACHE_MAX_AGE.
+    """
+    cache = _get_llm_cache() if keys else None
+    if cache is None:
+        return {}
+    try:
+        placeholders = ','.join('?' for _ in keys)
+        rows = cache.execute(f"SELECT key, value FROM llm_cache WHERE key IN ({placeholders}) "
+                             "AND created_at >= datetime('now', ?)", [*keys, _LLM_CACHE_MAX_AGE])
+        return {key: json.loads(value) for key, value in rows}
+    except Exception as e:
+        logging.warning(f"Error loading cached extraction results: {e}")
+        return {}
+
+def _save_cached_details(items):
+    """
+    Store freshly extracted details as (content key, details) pairs.
+    """
+    cache = _get_llm_cache() if items else None
+    if cache is None:
+        return
+    try:
+        with cache:
+            cache.executemany('INSERT OR REPLACE INTO llm_cache (key, value) VALUES (?, ?)',
+                              [(key, json.dumps(details)) for key, details in items])
+    except Exception as e:
+        logging.warning(f"Error saving extraction results to cache: {e}")
+
+def _make_key(disaster, details):
+    """
+    Build the grouping key for a disaster from its extracted details.
+    """
+    # Handle special case for SPC Mesoscale Discussions
+    if disaster.get("source_type") == "noaa_spc":
+        title = disaster.get("title", "").lower()
+        if "spc md" in title:
+            # Try to extract the MD number
+            md_match = _MD_NUMBER_RE.search(title)
+            if md_match:
+                return f"Severe Weather Discussion (MD {md_match.group(1)})"
+    
+    # Use extracted information for grouping
+    disaster_type = details.get("disaster_type", "Unknown Type")
+    location = details.get("location", "Unknown Location")
+    date = details.get("date", "Unknown Date")
+    severity = details.get("severity")
+    
+    # Include alert level in the key for GDACS entries
+    if disaster.get("source_type") == "gdacs" and details.get("alert_level"):
+        alert_level = details.get("alert_level", "").capitalize()
+        return f"{disaster_type} ({alert_level} Alert) in {location} on {date}"
+    # Include severity in the key if available
+    if severity:
+        return f"{disaster_type} ({severity}) in {location} on {date}"
+    return f"{disaster_type} in {location} on {date}"
 
 def group_disasters(disasters):
     """
     Group disasters by information extracted via LLM, using batch processing.
     """
-    grouped = defaultdict(list)
+    grouped = {}
     
-    # Filter out obvious non-matching entries first (before API calls)
-    initial_filtered = [d for d in disasters if not should_filter_entry(d)]
+    # Filter out obvious non-matching entries first (before API calls); entries
+    # dropped here are never prepared or sent to the LLM
+    initial_filtered = [d for d in disasters if _prefilter(d) is not FilterDecision.DROP]
     
     if not initial_filtered:
         return grouped
@@ -452,15 +825,45 @@ def group_disasters(disasters):
     # Prepare entries for batch processing
     prepared_entries = [prepare_entry_for_extraction(entry) for entry in initial_filtered]
     
+    # Entries with identical content share one extraction, both within this run
+    # (e.g. the same alert mirrored by two feeds) and across runs via the cache
+    entries_by_key = {}
+    for entry in prepared_entries:
+        entries_by_key.setdefault(_content_key(entry), []).append(entry)
+    _prune_llm_cache()
+    details_by_key = _load_cached_details(list(entries_by_key))
+    uncached_entries = [group[0] for key, group in entries_by_key.items() if key not in details_by_key]
+    logging.info(f"Reusing cached details for {len(details_by_key)} entries, extracting {len(uncached_entries)}")
+    
     # Process in batches to avoid token limits
-    all_details = {}
+    extracted = {}
+    batches = [uncached_entries[i:i+BATCH_SIZE] for i in range(0, len(uncached_entries), BATCH_SIZE)]
     
-    for i in range(0, len(prepared_entries), BATCH_SIZE):
-        batch = prepared_entries[i:i+BATCH_SIZE]
-        logging.info(f"Processing batch {i//BATCH_SIZE + 1} with {len(batch)} entries")
-        
-        batch_details = extract_details_in_batch(batch)
-        all_details.update(batch_details)
+    def run_batch(batch_number, batch):
+        logging.info(f"Processing batch {batch_number}/{len(batches)} with {len(batch)} entries")
+        return _extract_batch_results(batch)
+    
+    # The API calls are network-bound, so batches run concurrently in worker threads
+    # (bounded by OPENAI_MAX_CONCURRENCY and the shared tokens-per-minute window);
+    # map keeps the results in batch order
+    if batches:
+        max_workers = min(OPENAI_MAX_CONCURRENCY, len(batches))
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for batch_details in executor.map(run_batch, range(1, len(batches) + 1), batches):
+                extracted.update(batch_details)
+    
+    # Only real extractions are cached, never fallback details
+    new_details = []
+    for key, group in entries_by_key.items():
+        if key not in details_by_key and group[0]['id'] in extracted:
+            details_by_key[key] = extracted[group[0]['id']]
+            new_details.append((key, details_by_key[key]))
+    _save_cached_details(new_details)
+    
+    all_details = {}
+    for key, group in entries_by_key.items():
+        for entry in group:
+            all_details[entry['id']] = details_by_key.get(key) or _fallback_details(entry)
     
     # Match the extracted details back to the original entries and group them
     for disaster in initial_filtered:
@@ -475,41 +878,18 @@ def group_disasters(disasters):
             logging.warning(f"No details found for entry {entry_id}")
             continue
             
-        # Skip filtered entries (based on extracted details)
+        # Skip filtered entries (based on extracted details; the entry-only
+        # checks already ran before extraction)
         try:
-            if should_filter_entry(disaster, details):
+            if _postfilter_with_details(disaster, details):
                 continue
         except Exception as e:
             logging.error(f"Error in should_filter_entry: {e}")
             # Continue processing this entry despite the filter error
             # This ensures we don't lose alerts due to filtering issues
             
-        # Use extracted information for grouping
-        disaster_type = details.get("disaster_type", "Unknown Type")
-        location = details.get("location", "Unknown Location")
-        date = details.get("date", "Unknown Date")
-        severity = details.get("severity")
-        
-        # Include alert level in the key for GDACS entries
-        if disaster.get("source_type") == "gdacs" and details.get("alert_level"):
-            alert_level = details.get("alert_level", "").capitalize()
-            key = f"{disaster_type} ({alert_level} Alert) in {location} on {date}"
-        # Include severity in the key if available
-        elif severity:
-            key = f"{disaster_type} ({severity}) in {location} on {date}"
-        else:
-            key = f"{disaster_type} in {location} on {date}"
-            
-        # Handle special case for SPC Mesoscale Discussions
-        if disaster.get("source_type") == "noaa_spc" and "spc md" in disaster.get("title", "").lower():
-            # Try to extract the MD number
-            md_match = re.search(r'md\s+(\d+)', disaster.get("title", "").lower())
-            if md_match:
-                md_number = md_match.group(1)
-                key = f"Severe Weather Discussion (MD {md_number})"
-        
         # Store the original disaster data along with the extracted details
-        grouped[key].append({
+        grouped.setdefault(_make_key(disaster, details), []).append({
             "title": disaster["title"],
             "summary": disaster.get("summary", ""),
             "link": disaster["link"],
@@ -589,12 +969,15 @@ def process_disasters(disasters, max_retries=3, backoff_factor=2):
     logging.debug(f"Prompt sent to OpenAI:\n{prompt}")
 
     # Call OpenAI's API with retries using the new Responses API
+    instructions = "You process disaster alert data and format it for concise, informative Slack messages. Focus on providing clear what/where/when information."
+    estimated_tokens = _estimate_tokens(instructions, prompt, expected_output=len(prompt) // _CHARS_PER_TOKEN)
     for attempt in range(1, max_retries + 1):
         try:
-            response = client.responses.create(
+            response = _create_response(
+                estimated_tokens,
                 model=MODEL_NAME,
                 reasoning={"effort": REASONING_EFFORT_SUMMARY},
-                instructions="You process disaster alert data and format it for concise, informative Slack messages. Focus on providing clear what/where/when information.",
+                instructions=instructions,
                 input=prompt,
             )
             # Access the response using the new format
@@ -656,8 +1039,8 @@ def process_disasters(disasters, max_retries=3, backoff_factor=2):
             ])
 
         if attempt < max_retries:
-            sleep_time = backoff_factor ** attempt
-            logging.info(f"Retrying in {sleep_time} seconds...")
+            sleep_time = _backoff_delay(backoff_factor, attempt)
+            logging.info(f"Retrying in {sleep_time:.1f} seconds...")
             time.sleep(sleep_time)
         else:
             logging.error("Max retries reached. Failed to obtain summary from OpenAI.")
@@ -7,125 +7,751 @@ from dotenv import load_dotenv
 import logging
 import time
 import json
+import enum
+import ssl
+import types
+import threading
+import queue
+import atexit
+from concurrent.futures import ThreadPoolExecutor
 
-# Load environment variables
-load_dotenv()
+# orjson is optional; it serializes blocks for logging and size checks faster when installed.
+# The fallback produces the same compact UTF-8 output.
+try:
+    import orjson
+    _json_bytes = orjson.dumps
+except ImportError:
+    def _json_bytes(obj):
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
 
-# Slack configuration
-SLACK_BOT_TOKEN = os.getenv('SLACK_BOT_TOKEN')
-CHANNEL_NAME = os.getenv('CHANNEL_NAME')
+def _json_dumps(obj):
+    """
+    Serialize obj to compact JSON text.
+    """
+    return _json_bytes(obj).decode("utf-8")
+
+# Slack configuration. Read from the environment (and .env) by _ensure_env_loaded on
+# first use rather than at import, so importing this module does no file I/O.
+SLACK_BOT_TOKEN = None
+CHANNEL_NAME = None
+
+# Maximum number of messages send_many posts at the same time
+SLACK_CONCURRENCY = 4
+
+# How long a resolved channel ID is reused before the name is looked up again (seconds)
+SLACK_CHANNEL_CACHE_TTL = 3600
+
+# Resolve channels with a scheduled-then-deleted probe message instead of listing them
+SLACK_CHANNEL_PROBE = False
+
+# One TLS context for every request. WebClient opens each request with urllib, which
+# otherwise builds a new context (and reloads the CA bundle) per call. Created with
+# the first client, since loading the CA bundle is file I/O too.
+_SSL_CONTEXT = None
+
+# One WebClient per bot token, shared by every thread. WebClient holds no
+# per-request state (each call is an independent urllib request), so concurrent
+# sends from send_many and the background sender can safely use the same client.
+_client_pool = {}
+_CLIENT_POOL_LOCK = threading.Lock()
+
+def _pooled_client(token):
+    """
+    Return the pooled WebClient for a token, creating it if needed.
+    """
+    global _SSL_CONTEXT
+    with _CLIENT_POOL_LOCK:
+        pooled = _client_pool.get(token)
+        if pooled is None:
+            if _SSL_CONTEXT is None:
+                _SSL_CONTEXT = ssl.create_default_context()
+            pooled = _client_pool[token] = WebClient(token=token, ssl=_SSL_CONTEXT)
+        return pooled
+
+# Client for SLACK_BOT_TOKEN, created with the rest of the configuration
+client = None
+
+# Whether the required settings are present, checked once when they are loaded
+_CONFIG_OK = False
+
+_env_loaded = False
+_ENV_LOCK = threading.Lock()
+
+def _int_setting(name, default, minimum):
+    """
+    Read an integer setting from the environment, falling back to the default
+    (with an error logged) if it is not a whole number of at least minimum.
+    """
+    try:
+        value = int(os.getenv(name, str(default)))
+        if value < minimum:
+            raise ValueError(f"{name} must be at least {minimum}")
+    except ValueError as ve:
+        logging.error(f"Invalid {name} value: {ve}. Using default of {default}.")
+        value = default
+    return value
+
+def _ensure_env_loaded():
+    """
+    Load .env (values already in the real environment win) and read the Slack
+    settings, once. Set SKIP_DOTENV=1 to use the process environment only.
+    """
+    global _env_loaded, SLACK_BOT_TOKEN, CHANNEL_NAME, SLACK_CONCURRENCY
+    global SLACK_CHANNEL_CACHE_TTL, SLACK_CHANNEL_PROBE, client, _CONFIG_OK
+    if _env_loaded:
+        return
+    with _ENV_LOCK:
+        if _env_loaded:
+            return
+        if os.getenv('SKIP_DOTENV') != '1':
+            load_dotenv(override=False)
+        
+        SLACK_BOT_TOKEN = os.getenv('SLACK_BOT_TOKEN')
+        CHANNEL_NAME = os.getenv('CHANNEL_NAME')
+        SLACK_CONCURRENCY = _int_setting('SLACK_CONCURRENCY', 4, 1)
+        SLACK_CHANNEL_CACHE_TTL = _int_setting('SLACK_CHANNEL_CACHE_TTL', 3600, 0)
+        SLACK_CHANNEL_PROBE = os.getenv('SLACK_CHANNEL_PROBE', '0') == '1'
+        if client is None:
+            client = _pooled_client(SLACK_BOT_TOKEN)
+        
+        # Validate required environment variables
+        _CONFIG_OK = bool(SLACK_BOT_TOKEN and CHANNEL_NAME)
+        if not SLACK_BOT_TOKEN:
+            logging.error("SLACK_BOT_TOKEN is not set in .env file")
+        if not CHANNEL_NAME:
+            logging.error("CHANNEL_NAME is not set in .env file")
+        _env_loaded = True
+
+def get_client(token=None):
+    """
+    Return the shared WebClient for a bot token (default SLACK_BOT_TOKEN),
+    creating it on first use. Lets further workspaces be added without building
+    a client per call.
+    """
+    _ensure_env_loaded()
+    return _pooled_client(token or SLACK_BOT_TOKEN)
+
+# Slack limits per message: at most 50 blocks, and we keep the block payload well under its size cap
+SLACK_MAX_BLOCKS = 50
+SLACK_MAX_PAYLOAD_BYTES = 40 * 1024
+
+# Longest we wait on a single Retry-After (alerts go stale), and how many such waits one send may take
+MAX_RATE_WAIT = 30
+MAX_RATE_LIMIT_WAITS = 5
 
-# Initialize Slack client
-client = WebClient(token=SLACK_BOT_TOKEN)
+# Upper bound on the total time one send spends sleeping between attempts
+MAX_TOTAL_WAIT = 90
+
+# How long the background sender waits to coalesce queued alerts, how many it
+# posts at most per batch, and how many may be waiting before submit() blocks
+ALERT_FLUSH_SECONDS = 2
+ALERT_BATCH_SIZE = 50
+ALERT_QUEUE_SIZE = 1000
+
+# Channel IDs by name, each with a monotonic expiry, so Slack does not resolve the
+# name per post and channels are not re-listed on every send
+_channel_cache = {}
+_CHANNEL_CACHE_MAX = 128
+_CHANNEL_LOCK = threading.Lock()
+
+def _lookup_via_conversations_list(name):
+    """
+    Page through the workspace's channels for one matching name (with or without a
+    leading '#') or ID. Falls back to the name itself if the channel cannot be
+    listed (e.g. the token lacks channels:read) or is not found.
+    """
+    wanted = name.lstrip('#')
+    try:
+        cursor = None
+        while True:
+            response = client.conversations_list(
+                types="public_channel,private_channel",
+                exclude_archived=True,
+                limit=1000,
+                cursor=cursor
+            )
+            match = next((c['id'] for c in response['channels'] if wanted in (c['name'], c['id'])), None)
+            if match:
+                return match
+            cursor = response.get('response_metadata', {}).get('next_cursor')
+            if not cursor:
+                logging.warning(f"Channel {name} not found in conversations list; posting by name")
+                return name
+    except SlackApiError as e:
+        logging.warning(f"Could not resolve channel {name} to an ID: {e.response.get('error', 'unknown_error')}")
+    except Exception as e:
+        logging.warning(f"Could not resolve channel {name} to an ID: {e}")
+    return name
+
+def _lookup_via_schedule_probe(name):
+    """
+    Resolve a channel name in two calls: schedule a message to it two minutes out,
+    read the channel ID from the response, and delete the scheduled message.
+    
+    Needs only the chat:write scope already required for sending. Returns None if
+    the probe cannot be used, so the caller can fall back to listing channels.
+    """
+    try:
+        response = client.chat_scheduleMessage(
+            channel=name,
+            post_at=int(time.time()) + 120,
+            text="Disaster Alert System channel check"
+        )
+    except SlackApiError as e:
+        error_code = e.response.get('error', 'unknown_error')
+        if error_code == 'channel_not_found':
+            logging.warning(f"Channel {name} not found; posting by name")
+            return name
+        logging.warning(f"Channel probe for {name} failed: {error_code}")
+        return None
+    except Exception as e:
+        logging.warning(f"Channel probe for {name} failed: {e}")
+        return None
+    
+    channel_id = response['channel']
+    try:
+        client.chat_deleteScheduledMessage(
+            channel=channel_id,
+            scheduled_message_id=response['scheduled_message_id']
+        )
+    except Exception as e:
+        logging.error(f"Could not delete channel probe message {response['scheduled_message_id']} in {name}; "
+                      f"it will be posted at its scheduled time: {e}")
+    return channel_id
+
+def resolve_channel(name, refresh=False):
+    """
+    Return the channel ID for a channel name, cached for SLACK_CHANNEL_CACHE_TTL
+    seconds. A failed lookup is cached too, so it is not repeated on every send.
+    Pass refresh=True to discard the cached value and look it up again.
+    """
+    _ensure_env_loaded()
+    with _CHANNEL_LOCK:
+        now = time.monotonic()
+        hit = _channel_cache.get(name)
+        if hit and not refresh and now < hit[1]:
+            return hit[0]
+        
+        channel_id = _lookup_via_schedule_probe(name) if SLACK_CHANNEL_PROBE else None
+        if channel_id is None:
+            channel_id = _lookup_via_conversations_list(name)
+        _channel_cache.pop(name, None)
+        _channel_cache[name] = (channel_id, time.monotonic() + SLACK_CHANNEL_CACHE_TTL)
+        # Drop the oldest lookup once the cache is full
+        if len(_channel_cache) > _CHANNEL_CACHE_MAX:
+            del _channel_cache[next(iter(_channel_cache))]
+        return channel_id
 
-def send_disaster_alert_block(blocks, max_retries=3, backoff_factor=2):
+def _resolve_channel_id(refresh=False):
+    """
+    Return the channel ID for CHANNEL_NAME.
+    """
+    return resolve_channel(CHANNEL_NAME, refresh=refresh)
+
+class _Bucket:
+    """
+    Token bucket spacing out chat.postMessage calls to Slack's limit of about one
+    message per channel per second, so bursts wait briefly here instead of being
+    rate limited by Slack.
+    
+    Each rate_limited response halves the refill rate (down to 1/16) for the next
+    60 seconds, after which it returns to normal.
+    """
+    def __init__(self, capacity=1, refill_per_sec=1.0, slowdown_seconds=60, max_slowdown=16):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.slowdown_seconds = slowdown_seconds
+        self.max_slowdown = max_slowdown
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._slowdown = 1
+        self._slow_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _rate(self, now):
+        if self._slowdown > 1 and now >= self._slow_until:
+            self._slowdown = 1
+        return self.refill_per_sec / self._slowdown
+    
+    def acquire(self, timeout=None):
+        """
+        Take a token, sleeping until one is available.
+        
+        If that would take longer than timeout seconds, no token is taken and False
+        is returned at once, so callers can give up within their own deadline.
+        """
+        with self._lock:
+            now = time.monotonic()
+            rate = self._rate(now)
+            tokens = min(self.capacity, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            wait = (1 - tokens) / rate if tokens < 1 else 0
+            if timeout is not None and wait > timeout:
+                self._tokens = tokens
+                return False
+            # Reserve the token now, so concurrent callers queue up behind each other
+            self._tokens = tokens - 1
+        if wait > 0:
+            time.sleep(wait)
+        return True
+    
+    def throttle(self):
+        """
+        Halve the refill rate after Slack reported rate limiting.
+        """
+        with self._lock:
+            self._slowdown = min(self._slowdown * 2, self.max_slowdown)
+            self._slow_until = time.monotonic() + self.slowdown_seconds
+
+# Client-side limiter shared by every message post
+_bucket = _Bucket()
+
+# Notification text used when the blocks offer nothing better
+_FALLBACK_DEFAULT = "Disaster Alerts Summary"
+
+# Plain-text notice posted when a message's blocks are rejected. The channel is
+# added per call because it is only resolved on first send.
+_SIMPLIFIED_PAYLOAD = types.MappingProxyType({
+    "text": "⚠️ *Disaster Alert System*: New alerts detected, but there was an error formatting the message."
+})
+
+def _fallback_text(blocks):
+    """
+    Derive the notification text from the first line of the first mrkdwn section.
+    Malformed blocks are skipped here and reported by _validate_blocks.
+    """
+    first_section = next(
+        (b for b in blocks
+         if isinstance(b, dict) and b.get("type") == "section"
+         and isinstance(b.get("text"), dict) and b["text"].get("type") == "mrkdwn"
+         and isinstance(b["text"].get("text"), str)),
+        None
+    )
+    if first_section is None:
+        return _FALLBACK_DEFAULT
+    
+    # Only the first line is needed, so stop splitting at the first newline
+    first_line = first_section["text"]["text"].split("\n", 1)[0]
+    if len(first_line) <= len(_FALLBACK_DEFAULT):
+        return _FALLBACK_DEFAULT
+    return first_line[:100] + "..." if len(first_line) > 100 else first_line
+
+def _validate_blocks(blocks):
+    """
+    Check the structural limits Slack enforces on Block Kit messages, so a payload
+    it would reject as invalid_blocks is caught before the request is made.
+    
+    Returns:
+        str: Description of the first problem found, or None if the blocks look valid
+    """
+    if len(blocks) > SLACK_MAX_BLOCKS:
+        return f"{len(blocks)} blocks exceeds the limit of {SLACK_MAX_BLOCKS}"
+    
+    for i, block in enumerate(blocks):
+        if not isinstance(block, dict) or not block.get("type"):
+            return f"block {i} has no type"
+        
+        block_type = block["type"]
+        if block_type == "section":
+            if "text" not in block:
+                if not block.get("fields"):
+                    return f"section block {i} has neither text nor fields"
+                continue
+            text_obj = block["text"] or {}
+            if not isinstance(text_obj, dict):
+                return f"section block {i} text is not a text object"
+            text = text_obj.get("text")
+            if not text:
+                return f"section block {i} has empty text"
+            if not isinstance(text, str):
+                return f"section block {i} text is not a string"
+            if len(text) > 3000:
+                return f"section block {i} text is {len(text)} characters (limit 3000)"
+        elif block_type == "header":
+            text_obj = block.get("text") or {}
+            if not isinstance(text_obj, dict):
+                return f"header block {i} text is not a text object"
+            text = text_obj.get("text")
+            if not text:
+                return f"header block {i} has empty text"
+            if not isinstance(text, str):
+                return f"header block {i} text is not a string"
+            if len(text) > 150:
+                return f"header block {i} text is {len(text)} characters (limit 150)"
+    
+    return None
+
+def _send_simplified_message(channel, deadline):
+    """
+    Post a plain-text notice in place of a message whose blocks could not be sent,
+    unless the rate limiter would hold it past the monotonic deadline.
+    
+    Returns:
+        bool: True if the notice was posted
+    """
+    try:
+        if not _bucket.acquire(timeout=deadline - time.monotonic()):
+            logging.error("No time left to send the simplified message within the retry wait budget")
+            return False
+        client.chat_postMessage(channel=channel, **_SIMPLIFIED_PAYLOAD)
+        logging.info("Sent simplified message after block formatting error")
+        return True
+    except Exception as e:
+        logging.error(f"Failed to send simplified message: {e}")
+        return False
+
+# Slack errors that no retry can fix, so the send gives up immediately
+_PERMANENT_ERRORS = frozenset({
+    "invalid_blocks",
+    "channel_not_found",
+    "not_in_channel",
+    "invalid_auth",
+    "token_revoked",
+    "account_inactive",
+})
+
+class SendOutcome(enum.Enum):
+    """
+    How a send ended: SENT, RETRY after a transient failure that a later attempt
+    may get past, or FAILED when Slack or the local configuration rules out any
+    retry of the same message.
+    """
+    SENT = "sent"
+    RETRY = "retry"
+    FAILED = "failed"
+
+def _wait_before_retry(deadline, seconds):
+    """
+    Sleep for the given number of seconds, cut short at the monotonic deadline.
+    
+    Returns:
+        bool: False, without sleeping, if the deadline has already passed
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return False
+    time.sleep(min(seconds, remaining))
+    return True
+
+def send_disaster_alert_block(blocks, fallback_text=None, max_retries=3, backoff_factor=2):
     """
     Sends a Block Kit formatted message to Slack with retry logic.
     
     Args:
         blocks (list): List of Slack Block Kit blocks
+        fallback_text (str): Notification text; derived from the blocks if not given
         max_retries (int): Maximum number of retry attempts
         backoff_factor (int): Factor for exponential backoff
         
     Returns:
         bool: True if message was sent successfully, False otherwise
     """
-    # Validate required environment variables
-    if not SLACK_BOT_TOKEN:
-        logging.error("SLACK_BOT_TOKEN is not set in .env file")
-        return False
-        
-    if not CHANNEL_NAME:
-        logging.error("CHANNEL_NAME is not set in .env file")
-        return False
+    return _send_block(blocks, fallback_text, max_retries, backoff_factor) is SendOutcome.SENT
+
+def _send_block(blocks, fallback_text=None, max_retries=3, backoff_factor=2):
+    """
+    Send one message as send_disaster_alert_block does, reporting how it ended.
+    
+    Returns:
+        SendOutcome: SENT, RETRY if it could go through later, FAILED if it cannot
+    """
+    _ensure_env_loaded()
+    if not _CONFIG_OK:
+        logging.error("Slack is not configured (see SLACK_BOT_TOKEN and CHANNEL_NAME); message not sent")
+        return SendOutcome.FAILED
         
-    # Generate a fallback text from the blocks for notifications
-    fallback_text = "Disaster Alerts Summary"
-    for block in blocks:
-        if block.get("type") == "section" and "text" in block and block["text"].get("type") == "mrkdwn":
-            # Extract first line of text for fallback
-            text = block["text"].get("text", "")
-            first_line = text.split("\n")[0] if text else ""
-            if first_line and len(first_line) > len(fallback_text):
-                fallback_text = first_line[:100] + "..." if len(first_line) > 100 else first_line
-            break
-    
-    # Attempt to send message with retries
-    for attempt in range(1, max_retries + 1):
+    # Generate a fallback text from the blocks for notifications, unless the caller already has one
+    if fallback_text is None:
+        fallback_text = _fallback_text(blocks)
+    
+    channel = _resolve_channel_id()
+    channel_refreshed = False
+    
+    # Backoff before each retry, and a deadline bounding the total time spent waiting,
+    # both in retry sleeps and for the rate limiter
+    schedule = tuple(backoff_factor ** i for i in range(1, max_retries + 1))
+    deadline = time.monotonic() + MAX_TOTAL_WAIT
+    
+    # Catch malformed blocks locally instead of after a round trip to Slack
+    problem = _validate_blocks(blocks)
+    if problem:
+        logging.error(f"Invalid Block Kit format: {problem}")
+        logging.error("Problematic blocks: %s", _json_dumps(blocks))
+        _send_simplified_message(channel, deadline)
+        return SendOutcome.FAILED  # Still count as failure of the original message
+    
+    # Attempt to send message with retries; waiting out a rate limit does not use up an attempt
+    attempt = 1
+    rate_limit_waits = 0
+    while attempt <= max_retries:
         try:
-            # Log the blocks being sent (at debug level to avoid clutter)
-            logging.debug(f"Sending blocks to Slack: {json.dumps(blocks, indent=2)}")
+            # Log the blocks being sent (at debug level to avoid clutter), serializing them only if that level is on
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug("Sending blocks to Slack: %s", _json_dumps(blocks))
             
+            if not _bucket.acquire(timeout=deadline - time.monotonic()):
+                logging.error(f"Retry wait budget of {MAX_TOTAL_WAIT}s used up waiting for the rate limiter. "
+                              "Failed to send message to Slack.")
+                return SendOutcome.RETRY
+            started = time.monotonic()
             response = client.chat_postMessage(
-                channel=CHANNEL_NAME,
+                channel=channel,
                 blocks=blocks,
                 text=fallback_text
             )
             
             logging.info(f"Message sent successfully to {CHANNEL_NAME} (timestamp: {response['ts']})")
-            return True
+            return SendOutcome.SENT
             
         except SlackApiError as e:
             error_code = e.response.get('error', 'unknown_error')
             
-            # Handle specific error types
-            if error_code == 'invalid_blocks':
-                logging.error(f"Invalid Block Kit format: {e.response['error']}")
-                
-                # Log the problematic blocks
-                logging.error(f"Problematic blocks: {json.dumps(blocks, indent=2)}")
-                
-                # Try to send a simplified message instead
-                try:
-                    simplified_message = "⚠️ *Disaster Alert System*: New alerts detected, but there was an error formatting the message."
-                    client.chat_postMessage(
-                        channel=CHANNEL_NAME,
-                        text=simplified_message
-                    )
-                    logging.info("Sent simplified message after block formatting error")
-                    return False  # Still count as failure of the original message
-                except SlackApiError:
-                    pass  # If this also fails, continue with retry logic
+            # Permanent errors: retrying the same request cannot succeed
+            if error_code in _PERMANENT_ERRORS:
+                if error_code == 'invalid_blocks':
+                    logging.error(f"Invalid Block Kit format: {e.response['error']}")
                     
-                # Don't retry for invalid blocks as it's likely a formatting issue
-                break
-                
-            elif error_code == 'channel_not_found':
-                logging.error(f"Channel not found: {CHANNEL_NAME}")
-                break  # Don't retry for non-existent channel
-                
-            elif error_code == 'not_in_channel':
-                logging.error(f"Bot is not in channel: {CHANNEL_NAME}")
-                break  # Don't retry if bot isn't in the channel
+                    # Log the problematic blocks
+                    logging.error("Problematic blocks: %s", _json_dumps(blocks))
+                    
+                    # Try to send a simplified message instead
+                    if _send_simplified_message(channel, deadline):
+                        return SendOutcome.FAILED  # Still count as failure of the original message
+                    
+                elif error_code == 'channel_not_found':
+                    # The cached ID may be stale (e.g. the channel was recreated); look it up once more
+                    if not channel_refreshed:
+                        channel_refreshed = True
+                        refreshed = _resolve_channel_id(refresh=True)
+                        if refreshed != channel:
+                            channel = refreshed
+                            continue
+                    logging.error(f"Channel not found: {CHANNEL_NAME}")
+                    
+                elif error_code == 'not_in_channel':
+                    logging.error(f"Bot is not in channel: {CHANNEL_NAME}")
+                    
+                else:
+                    logging.error(f"Slack rejected the bot token or account ({error_code}); not retrying")
+                return SendOutcome.FAILED
                 
-            elif error_code == 'rate_limited':
+            if error_code == 'rate_limited':
+                _bucket.throttle()
+                rate_limit_waits += 1
+                if rate_limit_waits > MAX_RATE_LIMIT_WAITS:
+                    logging.error(f"Still rate limited by Slack after {MAX_RATE_LIMIT_WAITS} waits. Failed to send message to Slack.")
+                    break
                 retry_after = int(e.response.headers.get('Retry-After', 60))
-                logging.warning(f"Rate limited by Slack. Retrying after {retry_after} seconds")
-                time.sleep(retry_after)
-                continue  # Try again after waiting
-                
-            else:
-                logging.error(f"Attempt {attempt}: Slack API error: {error_code} - {e}")
+                wait = min(retry_after, MAX_RATE_WAIT)
+                logging.warning(f"Rate limited by Slack after {time.monotonic() - started:.2f}s. "
+                                f"Retrying after {wait} seconds (Retry-After: {retry_after})")
+                if not _wait_before_retry(deadline, wait):
+                    logging.error(f"Retry wait budget of {MAX_TOTAL_WAIT}s used up. Failed to send message to Slack.")
+                    break
+                continue  # Try again after waiting, without counting an attempt
                 
-            # For other errors, implement exponential backoff
-            if attempt < max_retries:
-                sleep_time = backoff_factor ** attempt
-                logging.info(f"Retrying in {sleep_time} seconds...")
-                time.sleep(sleep_time)
             else:
-                logging.error("Max retries reached. Failed to send message to Slack.")
+                logging.error("Attempt %d: Slack API error: %s (status=%s)",
+                              attempt, error_code, getattr(e.response, "status_code", "?"))
                 
         except Exception as e:
-            logging.error(f"Unexpected error sending message to Slack: {e}")
-            
-            if attempt < max_retries:
-                sleep_time = backoff_factor ** attempt
-                logging.info(f"Retrying in {sleep_time} seconds...")
-                time.sleep(sleep_time)
-            else:
-                logging.error("Max retries reached. Failed to send message to Slack.")
+            # The traceback is only worth its cost when debugging
+            logging.error("Unexpected error sending message to Slack: %s", e,
+                          exc_info=logging.getLogger().isEnabledFor(logging.DEBUG))
+        
+        # For other errors, implement exponential backoff
+        if attempt < max_retries:
+            sleep_time = schedule[attempt - 1]
+            logging.info(f"Retrying in {sleep_time} seconds...")
+            if not _wait_before_retry(deadline, sleep_time):
+                logging.error(f"Retry wait budget of {MAX_TOTAL_WAIT}s used up. Failed to send message to Slack.")
+                break
+        else:
+            logging.error("Max retries reached. Failed to send message to Slack.")
+        
+        attempt += 1
+    
+    return SendOutcome.RETRY
+
+# Separator placed between coalesced alerts
+_DIVIDER = {"type": "divider"}
+
+def _pack_block_groups(block_groups, max_blocks=SLACK_MAX_BLOCKS, max_bytes=SLACK_MAX_PAYLOAD_BYTES):
+    """
+    Concatenate block groups, separated by dividers, into as few messages as fit
+    within the per-message block count and payload size limits.
+    
+    A group that does not fit in the current message starts a new one, and a group
+    larger than a whole message is split across several.
+    """
+    messages = [[]]
+    size = 0
+    first = True
+    for group in block_groups:
+        if not group:
+            continue
+        blocks = list(group) if first else [_DIVIDER] + list(group)
+        first = False
+        
+        for block in blocks:
+            current = messages[-1]
+            block_size = len(_json_bytes(block))
+            if current and (len(current) >= max_blocks or size + block_size > max_bytes):
+                # Don't end a message on a separator
+                if current[-1] is _DIVIDER:
+                    current.pop()
+                current = []
+                messages.append(current)
+                size = 0
+            if block is _DIVIDER and not current:
+                continue
+            current.append(block)
+            size += block_size
+    
+    return [message for message in messages if message]
+
+def send_disaster_alert_blocks_batched(block_groups, max_blocks=SLACK_MAX_BLOCKS):
+    """
+    Send several alerts' block groups in as few Slack messages as possible.
     
-    return False
+    Args:
+        block_groups (list): List of Block Kit block lists, one per alert
+        max_blocks (int): Maximum number of blocks per message
+        
+    Returns:
+        bool: True if every message was sent successfully, False otherwise
+    """
+    return _send_batched(block_groups, max_blocks) is SendOutcome.SENT
+
+def _send_batched(block_groups, max_blocks=SLACK_MAX_BLOCKS):
+    """
+    Send block groups as send_disaster_alert_blocks_batched does, reporting one
+    outcome for the whole batch.
+    
+    Returns:
+        SendOutcome: SENT if every message went through. If only some did, FAILED,
+            since sending the batch again would repeat the messages already posted.
+            Otherwise RETRY if any message may still go through later, else FAILED.
+    """
+    messages = _pack_block_groups(block_groups, max_blocks=max_blocks)
+    logging.info(f"Sending {len(block_groups)} alert(s) to Slack in {len(messages)} message(s)")
+    
+    outcomes = [_send_block(blocks) for blocks in messages]
+    delivered = outcomes.count(SendOutcome.SENT)
+    if delivered == len(outcomes):
+        return SendOutcome.SENT
+    if delivered:
+        logging.error(f"Only {delivered} of {len(outcomes)} messages reached Slack; "
+                      "not sending the batch again, which would repeat the delivered part")
+        return SendOutcome.FAILED
+    return SendOutcome.RETRY if SendOutcome.RETRY in outcomes else SendOutcome.FAILED
+
+def send_many(block_lists, max_workers=None):
+    """
+    Send several independent Block Kit messages concurrently.
+    
+    Each message is sent with send_disaster_alert_block, so retries, backoff and
+    rate-limit handling are unchanged; at most max_workers (default
+    SLACK_CONCURRENCY) requests are in flight at once. Messages may arrive in any
+    order, so use send_disaster_alert_blocks_batched for alerts that belong together.
+    
+    Returns:
+        list: One bool per message, in the order given, True if it was sent
+    """
+    if not block_lists:
+        return []
+    
+    _ensure_env_loaded()
+    max_workers = max(1, min(max_workers or SLACK_CONCURRENCY, len(block_lists)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(send_disaster_alert_block, block_lists))
+
+# Alerts waiting for the background sender. The bound applies backpressure to
+# producers if Slack falls far behind.
+_ALERT_QUEUE = queue.Queue(maxsize=ALERT_QUEUE_SIZE)
+_FLUSH = object()  # Queued by flush_now so the worker sends without waiting for more
+_worker = None
+_WORKER_LOCK = threading.Lock()
+
+def _drain():
+    """
+    Worker loop: take the next queued alert, coalesce whatever else arrives within
+    ALERT_FLUSH_SECONDS (up to ALERT_BATCH_SIZE alerts), post them together, and
+    report the outcome to each alert's on_sent callback.
+    """
+    while True:
+        item = _ALERT_QUEUE.get()
+        taken = 1
+        batch = []
+        deadline = time.monotonic() + ALERT_FLUSH_SECONDS
+        while item is not _FLUSH:
+            batch.append(item)
+            if len(batch) >= ALERT_BATCH_SIZE:
+                break
+            remaining = deadline - time.monotonic()
+            try:
+                item = _ALERT_QUEUE.get(timeout=remaining) if remaining > 0 else _ALERT_QUEUE.get_nowait()
+            except queue.Empty:
+                break
+            taken += 1
+        
+        try:
+            outcome = SendOutcome.RETRY
+            if batch:
+                outcome = _send_batched([blocks for blocks, _ in batch])
+        except Exception as e:
+            logging.error(f"Error sending queued alerts to Slack: {e}")
+        finally:
+            # The batch is reported as a whole, so every alert in it gets the same outcome
+            for _, on_sent in batch:
+                if on_sent is None:
+                    continue
+                try:
+                    on_sent(outcome)
+                except Exception as e:
+                    logging.error(f"Error in Slack delivery callback: {e}")
+            for _ in range(taken):
+                _ALERT_QUEUE.task_done()
+
+def _ensure_worker():
+    """
+    Start the background sender on first use, and make sure whatever it still
+    holds is sent before the interpreter exits.
+    """
+    global _worker
+    with _WORKER_LOCK:
+        if _worker is None:
+            _worker = threading.Thread(target=_drain, name="slack-sender", daemon=True)
+            _worker.start()
+            atexit.register(flush_now)
+
+def submit(blocks, on_sent=None):
+    """
+    Queue an alert's blocks for the background sender and return without waiting
+    for Slack. Alerts submitted close together are posted in one batched message.
+    Blocks only if ALERT_QUEUE_SIZE alerts are already waiting.
+    
+    Args:
+        blocks (list): Block Kit blocks for the alert
+        on_sent (callable): Called from the sender thread with the SendOutcome of
+            the batch the alert was sent in
+    """
+    _ensure_worker()
+    _ALERT_QUEUE.put((blocks, on_sent))
+
+# Name the coalescing API was introduced under; kept for callers that use it
+enqueue_alert = submit
+
+def flush_now():
+    """
+    Post everything queued so far without waiting for more alerts, and return once
+    it has been sent and its callbacks have run. Also runs at interpreter exit once
+    the sender has started, so nothing queued is lost on shutdown.
+    """
+    if _worker is None:
+        return
+    _ALERT_QUEUE.put(_FLUSH)
+    _ALERT_QUEUE.join()
 
 # Simple test function for direct testing
 if __name__ == "__main__":
@@ -155,4 +781,16 @@ if __name__ == "__main__":
     ]
     
     result = send_disaster_alert_block(test_blocks)
-    print(f"Test message sent: {result}")
\ No newline at end of file
+    print(f"Test message sent: {result}")
+    
+    # Every thread shares one WebClient per token: sending must not replace it, and
+    # the pool must hand back the same client for the same token
+    shared_client = client
+    results = send_many([test_blocks, test_blocks])
+    assert client is shared_client, "sending replaced the shared WebClient"
+    assert get_client() is shared_client and get_client(SLACK_BOT_TOKEN) is shared_client
+    print(f"Concurrent test messages sent: {results}")
+    
+    # The same message through the background sender
+    enqueue_alert(test_blocks, on_sent=lambda outcome: print(f"Queued test message: {outcome.name}"))
+    flush_now()
\ No newline at end of file